@@ -0,0 +1,79 @@
+"""Checkpointer memory as thread count grows: MemorySaver vs. the bounded saver.
+
+Runs --threads conversations of --turns turns each against a stub LLM, then
+reports memory retained by the checkpointer (tracemalloc, after GC), the
+turn latency, and the cost of resuming a thread that was spilled to SQLite.
+
+Usage: python benchmarks/bench_checkpointer.py [--threads 2000] [--turns 3] [--max-threads 500] [--json out.json]
+"""
+import argparse
+import gc
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import FakeChatModel
+from src.checkpointer import BoundedSaver
+from src.tools import TOOLS
+
+def run(name: str, saver, threads: int, turns: int) -> dict:
+    agent = create_agent(model=FakeChatModel(latency_s=0), tools=TOOLS, checkpointer=saver)
+    gc.collect()
+    tracemalloc.start()
+    latencies = []
+    for turn in range(turns):
+        for t in range(threads):
+            start = time.perf_counter()
+            agent.invoke({"messages": [("human", f"turn {turn}")]}, {"configurable": {"thread_id": f"t{t}"}})
+            latencies.append(time.perf_counter() - start)
+    del agent
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Resume the oldest thread: a spill reload for the bounded saver.
+    agent = create_agent(model=FakeChatModel(latency_s=0), tools=TOOLS, checkpointer=saver)
+    start = time.perf_counter()
+    state = agent.get_state({"configurable": {"thread_id": "t0"}})
+    resume_ms = (time.perf_counter() - start) * 1000
+    return {
+        "saver": name,
+        "retained_mb": retained / 2**20,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "resume_ms": resume_ms,
+        "resumed_messages": len(state.values.get("messages", [])),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--max-threads", type=int, default=500)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        savers = [
+            ("MemorySaver", MemorySaver()),
+            (f"bounded {args.max_threads}", BoundedSaver(max_threads=args.max_threads)),
+            (f"bounded {args.max_threads} + spill", BoundedSaver(max_threads=args.max_threads,
+                                                                 spill_path=f"{tmp}/spill.db")),
+        ]
+        report = [run(name, saver, args.threads, args.turns) for name, saver in savers]
+
+    print(f"{args.threads} threads x {args.turns} turns")
+    print(f"{'saver':<24}{'retained MB':>13}{'turn p50 ms':>13}{'resume ms':>11}{'resumed msgs':>14}")
+    for r in report:
+        print(f"{r['saver']:<24}{r['retained_mb']:>13.1f}{r['turn_p50_ms']:>13.2f}"
+              f"{r['resume_ms']:>11.2f}{r['resumed_messages']:>14}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
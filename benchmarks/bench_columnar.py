@@ -0,0 +1,74 @@
+"""SQLite (indexed) vs. columnar engine latency on synthetic customers.
+
+Usage: python benchmarks/bench_columnar.py [--rows 1000000 10000000] [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_indexes import QUERIES
+from benchmarks.synthetic import write_customers_csv
+from src.columnar import ColumnarEngine
+from src.data_loader import init_sqlite_db
+
+def _median_ms(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def run(rows: int, repeat: int, tmp: Path) -> dict:
+    csv_path = write_customers_csv(tmp / f"customers_{rows}.csv", rows)
+    db_path = tmp / f"customers_{rows}.db"
+    init_sqlite_db(csv_path=csv_path, db_path=db_path)
+    csv_path.unlink()
+
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    engine = ColumnarEngine.from_sqlite(conn)
+    load_seconds = time.perf_counter() - start
+    memory_mb = sum(a.nbytes for a in engine.columns.values()) / 2**20
+
+    results = {}
+    for name, sql in QUERIES.items():
+        supported = engine.execute(sql) is not None
+        results[name] = {
+            "sqlite_ms": _median_ms(lambda: conn.execute(sql).fetchall(), repeat),
+            "columnar_ms": _median_ms(lambda: engine.execute(sql), repeat) if supported else None,
+        }
+    conn.close()
+    return {"rows": rows, "load_seconds": load_seconds, "memory_mb": memory_mb, "queries": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            result = run(rows, args.repeat, Path(tmp))
+            report.append(result)
+            print(f"\n{rows:,} rows (columnar load {result['load_seconds']:.1f}s, "
+                  f"{result['memory_mb']:.0f} MB)")
+            print(f"{'query':<24}{'sqlite ms':>11}{'columnar ms':>13}{'speedup':>9}")
+            for name, r in result["queries"].items():
+                if r["columnar_ms"] is None:
+                    print(f"{name:<24}{r['sqlite_ms']:>11.2f}{'fallback':>13}")
+                    continue
+                speedup = r["sqlite_ms"] / r["columnar_ms"] if r["columnar_ms"] else float("inf")
+                print(f"{name:<24}{r['sqlite_ms']:>11.2f}{r['columnar_ms']:>13.2f}{speedup:>8.1f}x")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,89 @@
+"""Requests/sec of the AgentCore entrypoint against a stub LLM: sync vs. async handler.
+
+"sync" replays the previous handler (agent.invoke) on a thread pool the size of
+the runtime's default worker pool; "async" drives the current async handler on
+one event loop, bounded by its concurrency limiter. Each request makes two stub
+LLM calls of --latency seconds plus one real SQLite tool call.
+
+Usage: python benchmarks/bench_concurrency.py [--requests 400] [--latency 0.2] [--threads 40] [--limit 64 256]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+
+from benchmarks.fake_llm import FakeChatModel
+from src import agentcore_runtime as runtime
+from src import warmup
+from src.concurrency import ConcurrencyLimiter
+from src.tools import TOOLS
+
+PROMPT = "How many customers have churned?"
+
+def _summary(name: str, latencies: list, seconds: float, errors: int = 0) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / seconds,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000,
+    }
+
+def run_sync(agent, requests: int, threads: int) -> dict:
+    def one(_):
+        start = time.perf_counter()
+        agent.invoke({"messages": [("human", PROMPT)]})
+        return time.perf_counter() - start
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return _summary(f"sync, {threads} threads", latencies, time.perf_counter() - start)
+
+async def run_async(requests: int, limit: int) -> dict:
+    runtime.limiter = ConcurrencyLimiter(limit, requests, 600.0)
+    async def one():
+        start = time.perf_counter()
+        result = await runtime.handler({"prompt": PROMPT}, {})
+        return time.perf_counter() - start, bool(result.get("error"))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(requests)))
+    return _summary(
+        f"async, limit {limit}", [r[0] for r in results], time.perf_counter() - start, sum(r[1] for r in results)
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--threads", type=int, default=40, help="sync worker pool (Starlette's default is 40)")
+    parser.add_argument("--limit", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    # Measure the request path, not the answer cache or pre-router.
+    runtime.settings.answer_cache_size = 0
+    runtime.settings.router_enabled = False
+    warmup.wait()
+    runtime._agent = create_agent(
+        model=FakeChatModel(latency_s=args.latency), tools=TOOLS, system_prompt=runtime.SYSTEM_PROMPT
+    )
+
+    report = [run_sync(runtime._agent, args.requests, args.threads)]
+    for limit in args.limit:
+        report.append(asyncio.run(run_async(args.requests, limit)))
+
+    print(f"{'mode':<22}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for r in report:
+        print(f"{r['mode']:<22}{r['rps']:>8.1f}{r['p50_ms']:>9.0f}{r['p99_ms']:>9.0f}{r['errors']:>8}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
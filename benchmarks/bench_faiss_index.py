@@ -0,0 +1,91 @@
+"""Recall, latency, build time and size of each FAISS index type, per corpus size.
+
+Uses synthetic clustered, unit-normalized vectors of the embedding model's
+dimension (no model download), so results reflect index structure rather
+than a particular corpus. Recall@k is measured against exact flat search on
+held-out queries; latency is one query per search call, as search_faq issues
+them. Search knobs (nprobe, efSearch) are swept without rebuilding.
+
+Usage: python benchmarks/bench_faiss_index.py [--sizes 10000 100000] [--dim 384] [--queries 500] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import faiss
+import numpy as np
+
+from src.data_loader import faiss_factory_string, new_faiss_index, set_search_params
+
+# (index type, search knob values): nprobe for IVF types, efSearch for HNSW
+CONFIGS = (
+    ("flat", (None,)),
+    ("sq", (None,)),
+    ("ivf", (1, 8, 32)),
+    ("pq", (8, 32)),
+    ("hnsw", (16, 64, 128)),
+)
+
+def clustered(n: int, dim: int, rng, clusters: int = 200) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    points = centers[rng.integers(clusters, size=n)] + 0.6 * rng.standard_normal((n, dim), dtype=np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+def measure(index, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies, found = [], []
+    for q in queries:
+        start = time.perf_counter()
+        _, ids = index.search(q[None, :], k)
+        latencies.append(time.perf_counter() - start)
+        found.append(ids[0])
+    recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+    return {"recall": float(recall), "p50_us": statistics.median(latencies) * 1e6,
+            "p99_us": sorted(latencies)[int(0.99 * len(latencies))] * 1e6}
+
+def run(size: int, dim: int, n_queries: int, k: int) -> list:
+    rng = np.random.default_rng(0)
+    data = clustered(size + n_queries, dim, rng)
+    vectors, queries = data[:size], data[size:]
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for index_type, knobs in CONFIGS:
+        start = time.perf_counter()
+        index, factory = new_faiss_index(vectors, faiss_factory_string(size, index_type))
+        index.add(vectors)
+        build_s = time.perf_counter() - start
+        size_mb = len(faiss.serialize_index(index)) / 2**20
+        for knob in knobs:
+            if index_type == "hnsw":
+                set_search_params(index, ef_search=knob)
+            elif knob:
+                set_search_params(index, nprobe=knob)
+            rows.append({"size": size, "type": index_type, "factory": factory, "knob": knob,
+                         "build_s": build_s, "size_mb": size_mb, **measure(index, queries, truth, k)})
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = [row for size in args.sizes for row in run(size, args.dim, args.queries, args.k)]
+    print(f"{'vectors':>8} {'type':<5}{'factory':<14}{'knob':>6}{'build s':>9}{'MB':>8}"
+          f"{f'recall@{args.k}':>11}{'p50 us':>9}{'p99 us':>9}")
+    for r in report:
+        knob = "-" if r["knob"] is None else r["knob"]
+        print(f"{r['size']:>8} {r['type']:<5}{r['factory']:<14}{knob:>6}{r['build_s']:>9.2f}{r['size_mb']:>8.1f}"
+              f"{r['recall']:>11.3f}{r['p50_us']:>9.0f}{r['p99_us']:>9.0f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
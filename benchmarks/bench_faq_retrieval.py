@@ -0,0 +1,74 @@
+"""Vector-only vs. hybrid (BM25 + vector, RRF) FAQ retrieval: latency and recall@3.
+
+Queries are the FAQ queries exercised in tests/test_agent.py, labelled with the
+FAQ questions a correct answer must come from.
+
+Usage: python benchmarks/bench_faq_retrieval.py [--modes lexical vector hybrid] [--repeat 20] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import tools
+
+QUERIES = {
+    "activate international roaming": ["How do I activate international roaming?"],
+    "pay my bill": ["How do I pay my bill?"],
+    "USSD code balance": ["What is the USSD code for balance check?", "What is the USSD code for data balance?"],
+    "prepaid plans available": ["What prepaid plans are available?"],
+    "roaming": ["How do I activate international roaming?", "Are international roaming packs available?"],
+    "billing payment": ["How do I pay my bill?", "What payment methods are accepted?"],
+    "5G network speed": ["What is the maximum data speed on 5G?"],
+}
+
+def _lexical(query: str, k: int = 3) -> list:
+    index = tools._get_lexical()
+    return [index.texts[i] for i, _ in index.search(query, k)]
+
+def _retrieve(mode: str, query: str) -> list:
+    return _lexical(query) if mode == "lexical" else tools._retrieve_faq(query, mode)
+
+def _recall(results: list, relevant: list) -> float:
+    found = sum(any(text.startswith(f"Q: {q}\n") for text in results) for q in relevant)
+    return found / min(len(relevant), 3)
+
+def run(mode: str, repeat: int) -> dict:
+    per_query = {}
+    for query, relevant in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            # Measure cold embeddings so the vector cost is not hidden by the query cache.
+            if tools._query_embeddings:
+                tools._query_embeddings.clear()
+            start = time.perf_counter()
+            results = _retrieve(mode, query)
+            samples.append(time.perf_counter() - start)
+        per_query[query] = {"recall@3": _recall(results, relevant), "ms": statistics.median(samples) * 1000}
+    return {
+        "mode": mode,
+        "recall@3": statistics.mean(r["recall@3"] for r in per_query.values()),
+        "median_ms": statistics.median(r["ms"] for r in per_query.values()),
+        "queries": per_query,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["lexical", "vector", "hybrid"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = [run(mode, args.repeat) for mode in args.modes]
+    print(f"{'query':<32}" + "".join(f"{r['mode'] + ' R@3':>14}{'ms':>8}" for r in report))
+    for query in QUERIES:
+        print(f"{query:<32}" + "".join(
+            f"{r['queries'][query]['recall@3']:>14.2f}{r['queries'][query]['ms']:>8.2f}" for r in report
+        ))
+    print(f"{'overall':<32}" + "".join(f"{r['recall@3']:>14.2f}{r['median_ms']:>8.2f}" for r in report))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,80 @@
+"""Prompt size and turn latency over a long conversation, with and without compaction.
+
+One thread of --turns turns. Each turn runs a SQL query that returns a
+15-row preview, the kind of verbose tool output that makes prompts grow. The
+stub LLM charges --prefill-us per input token, standing in for prefill cost.
+Reports estimated input tokens and latency at several points in the session,
+plus the time spent compacting.
+
+Usage: python benchmarks/bench_history.py [--turns 60] [--budget 6000] [--prefill-us 20] [--json out.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+from langgraph.checkpoint.memory import InMemorySaver
+
+from benchmarks.fake_llm import FakeChatModel
+from src import metrics
+from src.agent import SYSTEM_PROMPT
+from src.compaction import HistoryCompactionMiddleware
+from src.tools import TOOLS
+
+SQL = "SELECT customer_id, contract, tenure, monthly_charges, churn FROM customers WHERE churn = 'Yes'"
+CHECKPOINTS = (1, 10, 30, 60, 100)
+
+def run(budget: int, turns: int, prefill_s: float) -> dict:
+    metrics.reset()
+    model = FakeChatModel(latency_s=0, input_token_latency_s=prefill_s, tool_args={"sql": SQL})
+    agent = create_agent(model=model, tools=TOOLS, checkpointer=InMemorySaver(), system_prompt=SYSTEM_PROMPT,
+                         middleware=[HistoryCompactionMiddleware(budget)])
+    config = {"configurable": {"thread_id": "long-session"}}
+    points = {}
+    for turn in range(1, turns + 1):
+        start = time.perf_counter()
+        agent.invoke({"messages": [("human", f"Which churned customers pay the most? (follow-up {turn})")]}, config)
+        elapsed = time.perf_counter() - start
+        if turn in CHECKPOINTS or turn == turns:
+            tokens = metrics.snapshot()["summaries"]["history.input_tokens"]
+            points[turn] = {"input_tokens": tokens["max"], "turn_ms": elapsed * 1000}
+            metrics.reset()
+    return {"budget": budget, "turns": points}
+
+def compaction_overhead(turns: int) -> float:
+    """Mean time to compact one request at the end of the session, in ms."""
+    from src.compaction import compact
+    model = FakeChatModel(latency_s=0, tool_args={"sql": SQL})
+    agent = create_agent(model=model, tools=TOOLS, checkpointer=InMemorySaver())
+    config = {"configurable": {"thread_id": "overhead"}}
+    for turn in range(turns):
+        agent.invoke({"messages": [("human", f"question {turn}")]}, config)
+    messages = agent.get_state(config).values["messages"]
+    start = time.perf_counter()
+    for _ in range(20):
+        compact(messages, 6000)
+    return (time.perf_counter() - start) / 20 * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=6000)
+    parser.add_argument("--prefill-us", type=float, default=20.0, help="stub LLM latency per input token")
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = [run(budget, args.turns, args.prefill_us / 1e6) for budget in (0, args.budget)]
+    overhead = compaction_overhead(args.turns)
+
+    print(f"{'turn':>6}" + "".join(f"{'budget ' + str(r['budget'] or 'off'):>28}" for r in report))
+    print(f"{'':>6}" + f"{'input tokens':>16}{'turn ms':>12}" * len(report))
+    for turn in report[0]["turns"]:
+        row = "".join(f"{r['turns'][turn]['input_tokens']:>16.0f}{r['turns'][turn]['turn_ms']:>12.1f}" for r in report)
+        print(f"{turn:>6}{row}")
+    print(f"compaction: {overhead:.2f} ms per model call at turn {args.turns}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"runs": report, "compaction_ms": overhead}, indent=2))
@@ -0,0 +1,83 @@
+"""Full-scan vs. indexed latency for representative agent queries.
+
+Usage: python benchmarks/bench_indexes.py [--rows 7043 1000000] [--repeat 5] [--json out.json]
+"""
+import argparse
+import json
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import write_customers_csv
+from src.data_loader import CUSTOMER_INDEXES, init_sqlite_db
+
+QUERIES = {
+    "churn_count": "SELECT COUNT(*) FROM customers WHERE churn='Yes'",
+    "contract_groups": "SELECT contract, COUNT(*) FROM customers GROUP BY contract",
+    "fiber_avg_charge": "SELECT ROUND(AVG(monthly_charges),2) FROM customers WHERE internet_service='Fiber optic'",
+    "churn_by_payment": "SELECT payment_method, COUNT(*) FROM customers WHERE churn='Yes' GROUP BY payment_method",
+    "tenure_range": "SELECT COUNT(*) FROM customers WHERE tenure BETWEEN 12 AND 24",
+    "high_charges": "SELECT COUNT(*) FROM customers WHERE monthly_charges > 110",
+    "churn_rate_by_contract": "SELECT contract, AVG(churn='Yes') FROM customers GROUP BY contract",
+}
+
+def _time(db_path: Path, sql: str, repeat: int) -> float:
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql).fetchall()  # warm the page cache
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        samples.append(time.perf_counter() - start)
+    conn.close()
+    return statistics.median(samples)
+
+def _drop_indexes(db_path: Path):
+    conn = sqlite3.connect(db_path)
+    for statement in CUSTOMER_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {statement.split()[5]}")
+    conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    conn.commit()
+    conn.close()
+
+def run(rows: int, repeat: int, tmp: Path) -> dict:
+    csv_path = write_customers_csv(tmp / f"customers_{rows}.csv", rows)
+    indexed = tmp / f"indexed_{rows}.db"
+    ingest = init_sqlite_db(csv_path=csv_path, db_path=indexed)
+    scan = tmp / f"scan_{rows}.db"
+    shutil.copy(indexed, scan)
+    _drop_indexes(scan)
+
+    results = {}
+    for name, sql in QUERIES.items():
+        results[name] = {
+            "scan_ms": _time(scan, sql, repeat) * 1000,
+            "index_ms": _time(indexed, sql, repeat) * 1000,
+        }
+    return {"rows": rows, "ingest_seconds": ingest["seconds"], "queries": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[7043, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            result = run(rows, args.repeat, Path(tmp))
+            report.append(result)
+            print(f"\n{rows:,} rows (ingest {result['ingest_seconds']:.1f}s)")
+            print(f"{'query':<24}{'scan ms':>10}{'index ms':>10}{'speedup':>9}")
+            for name, r in result["queries"].items():
+                speedup = r["scan_ms"] / r["index_ms"] if r["index_ms"] else float("inf")
+                print(f"{name:<24}{r['scan_ms']:>10.2f}{r['index_ms']:>10.2f}{speedup:>8.1f}x")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
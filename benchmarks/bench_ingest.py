@@ -0,0 +1,84 @@
+"""Index build throughput and peak memory: one-shot embedding vs. the streaming pipeline.
+
+Builds a FAISS index from a synthetic FAQ of --scale times the shipped one.
+"one-shot" is the previous build: all documents loaded, embedded in one call
+into Python float lists, then FAISS.from_embeddings. "stream" is
+src.ingest.build_store at each --workers count (0 embeds in-process). The
+model is an offline stand-in burning --cost-ms of CPU per text, so scaling
+with workers is bounded by the cores available. Each variant runs in a fresh
+interpreter so its peak RSS is its own.
+
+Usage: python benchmarks/bench_ingest.py [--scale 200] [--workers 0 2 4] [--batch-size 64] [--cost-ms 2] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+def one_shot(csv_path: Path, emb) -> dict:
+    from langchain_community.vectorstores import FAISS
+    from src.data_loader import iter_faq_docs
+    start = time.perf_counter()
+    docs = list(iter_faq_docs(csv_path))
+    texts = [doc.page_content for doc in docs]
+    FAISS.from_embeddings(zip(texts, emb.embed_documents(texts)), emb,
+                          metadatas=[doc.metadata for doc in docs], ids=[doc.id for doc in docs])
+    return {"documents": len(docs), "seconds": time.perf_counter() - start}
+
+def stream(csv_path: Path, emb, workers: int, batch_size: int) -> dict:
+    from src.data_loader import iter_faq_docs
+    from src.ingest import build_store
+    _, _, report = build_store(iter_faq_docs(csv_path), emb, encoder=emb, workers=workers, batch_size=batch_size)
+    return report
+
+def variant(name: str, csv_path: Path, cost_s: float, batch_size: int) -> dict:
+    from benchmarks.fake_embeddings import FakeEmbeddings
+    from src.ingest import peak_memory_mb
+    emb = FakeEmbeddings(cost_s=cost_s)
+    report = one_shot(csv_path, emb) if name == "one-shot" else stream(csv_path, emb, int(name), batch_size)
+    report.update(peak_memory_mb())
+    report["docs_per_sec"] = report["documents"] / report["seconds"]
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=200, help="FAQ copies (227 documents each)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--cost-ms", type=float, default=2.0, help="stand-in model CPU time per document")
+    parser.add_argument("--json", type=Path)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(variant(args.variant, args.csv, args.cost_ms / 1000, args.batch_size)))
+        sys.exit(0)
+
+    from benchmarks.synthetic import write_faq_csv
+    report = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = write_faq_csv(Path(tmp) / "qna.csv", args.scale)
+        for name in ["one-shot", *map(str, args.workers)]:
+            command = [sys.executable, __file__, "--variant", name, "--csv", str(csv_path),
+                       "--cost-ms", str(args.cost_ms), "--batch-size", str(args.batch_size)]
+            env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "unused")}
+            proc = subprocess.run(command, env=env, capture_output=True, text=True)
+            if proc.returncode:
+                raise SystemExit(f"{name} failed:\n{proc.stderr[-4000:]}")
+            report.append({"variant": name, **json.loads(proc.stdout.strip().splitlines()[-1])})
+
+    print(f"{report[0]['documents']} documents, {args.cost_ms} ms model CPU each, {os.cpu_count()} CPUs")
+    print(f"{'build':<12}{'seconds':>9}{'docs/sec':>10}{'peak RSS MB':>13}{'worker peak MB':>16}")
+    for r in report:
+        name = r["variant"] if r["variant"] == "one-shot" else f"stream x{r['variant']}"
+        print(f"{name:<12}{r['seconds']:>9.1f}{r['docs_per_sec']:>10.0f}{r['peak_rss_mb']:>13.0f}"
+              f"{r['worker_peak_rss_mb']:>16.0f}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,74 @@
+"""Cost of the metrics layer: enabled vs. disabled.
+
+Times a bare span, the three tools (search_faq on its lexical fast path) and
+a full agent turn against a stub LLM (latency 0, so the agent's own overhead
+is what is measured), first with metrics on, then with metrics.enable(False).
+Also prints the stage breakdown of one traced agent turn.
+
+Usage: python benchmarks/bench_instrumentation.py [--iterations 2000] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+
+from benchmarks.fake_llm import FakeChatModel
+from src import metrics
+from src.instrumentation import ModelCallMetrics
+from src.tools import TOOLS, get_stats, query_customers, search_faq
+
+SQL = "SELECT contract, COUNT(*) FROM customers GROUP BY contract"
+
+def per_call_us(call, iterations: int) -> float:
+    iterations = max(iterations, 1)
+    samples = []
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            call()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    return statistics.median(samples)
+
+def empty_span():
+    with metrics.span("bench.empty"):
+        pass
+
+def run(iterations: int, agent) -> dict:
+    return {
+        "span": per_call_us(empty_span, iterations * 10),
+        "search_faq": per_call_us(lambda: search_faq.invoke({"query": "How do I activate a new SIM?"}), iterations),
+        "query_customers": per_call_us(lambda: query_customers.invoke({"sql": SQL}), iterations // 10),
+        "get_stats": per_call_us(lambda: get_stats.invoke({}), iterations),
+        "agent_turn": per_call_us(lambda: agent.invoke({"messages": [("human", "overview")]}),
+                                  iterations // 20),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    agent = create_agent(model=FakeChatModel(latency_s=0), tools=TOOLS, middleware=[ModelCallMetrics()])
+    run(10, agent)  # load indexes and models
+    with metrics.trace() as stages:
+        agent.invoke({"messages": [("human", "overview")]})
+    enabled = run(args.iterations, agent)
+    metrics.enable(False)
+    disabled = run(args.iterations, agent)
+    metrics.enable(True)
+
+    print(f"{'target':<18}{'enabled us':>12}{'disabled us':>13}{'overhead':>10}")
+    for target in enabled:
+        delta = enabled[target] - disabled[target]
+        print(f"{target:<18}{enabled[target]:>12.2f}{disabled[target]:>13.2f}{delta:>+10.2f}")
+    print("one agent turn: " + ", ".join(f"{s}={sec * 1000:.2f}ms" for s, sec in metrics.stage_totals(stages).items()))
+
+    if args.json:
+        args.json.write_text(json.dumps({"enabled_us": enabled, "disabled_us": disabled,
+                                         "stages_ms": {s: sec * 1000 for s, sec in stages}}, indent=2))
@@ -0,0 +1,85 @@
+"""Per-worker memory with private vs. shared embedding model and FAISS index.
+
+"private": each worker reads the index onto its heap (and loads its own model
+with --model). "shared": the parent loads the model before forking and workers
+memory-map the index. All workers stay alive while measuring, so PSS splits
+shared pages between them; the PSS sum is the container's real footprint.
+
+Usage: python benchmarks/bench_memory.py [--workers 4] [--index-rows 200000] [--dim 384] [--model] [--json out.json]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src import metrics
+
+def _write_index(path: Path, rows: int, dim: int):
+    import faiss
+    index = faiss.IndexFlatL2(dim)
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, 50_000):
+        index.add(rng.random((min(50_000, rows - start), dim), dtype=np.float32))
+    faiss.write_index(index, str(path))
+
+def _worker(mode: str, path: str, model: bool, loaded, measured, results):
+    import faiss
+    from src.data_loader import get_embeddings, read_faiss_index
+    if model:
+        get_embeddings()  # no-op in shared mode: inherited from the parent
+    index = read_faiss_index(path) if mode == "shared" else faiss.read_index(path)
+    index.search(np.zeros((1, index.d), dtype=np.float32), 3)  # touch every vector
+    loaded.wait()
+    results.put(metrics.process_memory())
+    measured.wait()
+
+def run(mode: str, workers: int, path: Path, model: bool) -> dict:
+    ctx = mp.get_context("fork")
+    if mode == "shared" and model:
+        from src.data_loader import get_embeddings
+        get_embeddings()
+    loaded, measured, results = ctx.Barrier(workers), ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, str(path), model, loaded, measured, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    per_worker = [results.get() for _ in procs]
+    measured.wait()
+    for p in procs:
+        p.join()
+    return {
+        "mode": mode,
+        "workers": per_worker,
+        "rss_mb": sum(w["rss_mb"] for w in per_worker) / workers,
+        "pss_total_mb": sum(w["pss_mb"] for w in per_worker),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--index-rows", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--model", action="store_true", help="also load the embedding model per worker")
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index.faiss"
+        _write_index(path, args.index_rows, args.dim)
+        index_mb = path.stat().st_size / 2**20
+        # Private first: the shared run loads the model into this process.
+        report = [run(mode, args.workers, path, args.model) for mode in ("private", "shared")]
+
+    print(f"{args.workers} workers, {index_mb:.0f} MB index" + (", with model" if args.model else ""))
+    print(f"{'mode':<10}{'RSS/worker MB':>15}{'anon/worker MB':>16}{'PSS total MB':>14}")
+    for r in report:
+        anon = sum(w["anon_mb"] for w in r["workers"]) / args.workers
+        print(f"{r['mode']:<10}{r['rss_mb']:>15.0f}{anon:>16.0f}{r['pss_total_mb']:>14.0f}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"index_mb": index_mb, "runs": report}, indent=2))
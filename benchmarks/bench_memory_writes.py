@@ -0,0 +1,127 @@
+"""Turn latency with synchronous vs. write-behind conversation memory writes.
+
+The store is an InMemoryStore that sleeps --store-latency per put, standing in
+for AgentCore Memory's one create_event call per message. "sync" replays the
+previous middleware (a store.put in every model hook); "write-behind" uses
+MemoryWriter. Each turn is a tool call plus an answer (two model steps) on a
+stub LLM. --fail-rate makes that fraction of store batches raise.
+
+Usage: python benchmarks/bench_memory_writes.py [--turns 50] [--store-latency 0.05] [--fail-rate 0.2]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_config
+from langgraph.store.base import PutOp
+from langgraph.store.memory import InMemoryStore
+
+from benchmarks.fake_llm import FakeChatModel
+from src import metrics
+from src.memory_writer import MemoryMiddleware, MemoryWriter
+from src.tools import TOOLS
+
+class SlowStore(InMemoryStore):
+    """InMemoryStore with a remote-like latency per put and optional random failures."""
+
+    def __init__(self, latency_s: float, fail_rate: float = 0.0):
+        super().__init__()
+        self.latency_s = latency_s
+        self.fail_rate = fail_rate
+        self.calls = 0
+
+    def batch(self, ops):
+        ops = list(ops)
+        if not all(isinstance(op, PutOp) for op in ops):
+            return super().batch(ops)
+        self.calls += 1
+        time.sleep(self.latency_s * len(ops))
+        if random.random() < self.fail_rate:
+            raise ConnectionError("simulated store outage")
+        return super().batch(ops)
+
+class SyncMemoryMiddleware(AgentMiddleware):
+    """The previous behaviour: one store.put per model hook, on the request path."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def _record(self, state, message_type):
+        configurable = get_config()["configurable"]
+        namespace = (configurable["actor_id"], configurable["thread_id"])
+        for msg in reversed(state["messages"]):
+            if isinstance(msg, message_type):
+                self.store.put(namespace, str(uuid.uuid4()), {"message": msg})
+                break
+
+    def before_model(self, state, runtime):
+        self._record(state, HumanMessage)
+
+    def after_model(self, state, runtime):
+        self._record(state, AIMessage)
+
+def run(mode: str, turns: int, latency_s: float, fail_rate: float) -> dict:
+    store = SlowStore(latency_s, fail_rate)
+    writer = None
+    if mode == "sync":
+        middleware = SyncMemoryMiddleware(store)
+    else:
+        writer = MemoryWriter(store, flush_interval_s=0.2, retry_backoff_s=0.05)
+        middleware = MemoryMiddleware(writer)
+    agent = create_agent(model=FakeChatModel(latency_s=0), tools=TOOLS,
+                         checkpointer=InMemorySaver(), middleware=[middleware])
+    latencies, errors = [], 0
+    for i in range(turns):
+        config = {"configurable": {"actor_id": "bench", "thread_id": f"t{i % 5}"}}
+        start = time.perf_counter()
+        try:
+            agent.invoke({"messages": [("human", f"How many customers have churned? #{i}")]}, config)
+        except ConnectionError:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    drain_start = time.perf_counter()
+    if writer:
+        writer.close(timeout=60)
+    written = sum(len(store.search(("bench", f"t{t}"), limit=10_000)) for t in range(5))
+    return {
+        "mode": mode,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "turn_max_ms": max(latencies) * 1000,
+        "failed_turns": errors,
+        "store_calls": store.calls,
+        "messages_written": written,
+        "drain_ms": (time.perf_counter() - drain_start) * 1000,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--store-latency", type=float, default=0.05)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    random.seed(0)
+    report = [run(mode, args.turns, args.store_latency, args.fail_rate) for mode in ("sync", "write-behind")]
+    counters = metrics.snapshot()["counters"]
+
+    print(f"{'mode':<14}{'turn p50 ms':>12}{'turn max ms':>12}{'failed':>8}{'store calls':>13}{'written':>9}")
+    for r in report:
+        print(f"{r['mode']:<14}{r['turn_p50_ms']:>12.1f}{r['turn_max_ms']:>12.1f}{r['failed_turns']:>8}"
+              f"{r['store_calls']:>13}{r['messages_written']:>9}")
+    print("write-behind: " + ", ".join(f"{k.split('.', 1)[1]} {v:.0f}"
+                                       for k, v in sorted(counters.items()) if k.startswith("memory.")))
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,100 @@
+"""Pre-router accuracy, coverage and latency on a labelled query set.
+
+Coverage is the share of prompts routed without the model (confidence above the
+threshold and a pre-runnable tool); accuracy is measured on those prompts and,
+separately, on the top-1 label over all prompts.
+
+Usage: python benchmarks/bench_router.py [--threshold 0.6] [--json out.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.router import PRE_RUNNABLE, classify
+
+LABELLED = [
+    ("How do I activate roaming?", "search_faq"),
+    ("How do I activate international roaming?", "search_faq"),
+    ("How do I pay my bill?", "search_faq"),
+    ("What plans are available?", "search_faq"),
+    ("What prepaid plans are available?", "search_faq"),
+    ("Is eSIM supported?", "search_faq"),
+    ("How long does activation take?", "search_faq"),
+    ("What is the USSD code for balance check?", "search_faq"),
+    ("Can I disable autopay anytime?", "search_faq"),
+    ("How do I dispute a bill charge?", "search_faq"),
+    ("What happens if my bill is overdue?", "search_faq"),
+    ("How can I port my number to your network?", "search_faq"),
+    ("Why is my internet slow?", "search_faq"),
+    ("Where can I find my invoice?", "search_faq"),
+    ("Is 5G available?", "search_faq"),
+    ("What's the price for 5G? (asking for a friend)", "search_faq"),
+    ("How to recharge my prepaid number", "search_faq"),
+    ("Can I get a refund for an unused pack?", "search_faq"),
+    ("What is the maximum data speed on 5G?", "search_faq"),
+    ("Does the family plan include roaming?", "search_faq"),
+    ("How many customers have churned?", "query_customers"),
+    ("How many customers are on fiber optic?", "query_customers"),
+    ("What is the average monthly charge?", "query_customers"),
+    ("Average tenure of churned customers", "query_customers"),
+    ("What percentage of customers churn on month-to-month contracts?", "query_customers"),
+    ("Count customers paying by electronic check", "query_customers"),
+    ("What is the churn rate for senior citizens?", "query_customers"),
+    ("Highest monthly charges among two year contracts", "query_customers"),
+    ("Breakdown of customers by payment method", "query_customers"),
+    ("Total charges for customers with tech support", "query_customers"),
+    ("How many senior citizens have partners?", "query_customers"),
+    ("Median tenure for DSL customers", "query_customers"),
+    ("Which contract type has the lowest churn?", "query_customers"),
+    ("Number of customers with streaming TV", "query_customers"),
+    ("Give me a summary of the customer base", "get_stats"),
+    ("Overview of our customers", "get_stats"),
+    ("Summarize the customer base", "get_stats"),
+    ("Quick snapshot of the subscribers", "get_stats"),
+    ("Customer base at a glance", "get_stats"),
+    ("Can you give me an overview?", "get_stats"),
+]
+
+def run(threshold: float) -> dict:
+    rows = []
+    for prompt, label in LABELLED:
+        start = time.perf_counter()
+        tool, confidence = classify(prompt)
+        seconds = time.perf_counter() - start
+        routed = tool in PRE_RUNNABLE and confidence >= threshold
+        rows.append({"prompt": prompt, "label": label, "tool": tool,
+                     "confidence": confidence, "routed": routed, "us": seconds * 1e6})
+    routed = [r for r in rows if r["routed"]]
+    pre_runnable = [r for r in rows if r["label"] in PRE_RUNNABLE]
+    return {
+        "threshold": threshold,
+        "top1_accuracy": sum(r["tool"] == r["label"] for r in rows) / len(rows),
+        "coverage": len(routed) / len(pre_runnable),
+        "routed_accuracy": sum(r["tool"] == r["label"] for r in routed) / len(routed) if routed else 0.0,
+        "p50_us": statistics.median(r["us"] for r in rows),
+        "max_us": max(r["us"] for r in rows),
+        "queries": rows,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = run(args.threshold)
+    print(f"{'prompt':<66}{'label':<17}{'routed to':<17}{'conf':>6}")
+    for r in report["queries"]:
+        mark = "" if r["tool"] == r["label"] else "  <- miss"
+        routed = r["tool"] if r["routed"] else f"({r['tool']})"
+        print(f"{r['prompt'][:64]:<66}{r['label']:<17}{routed:<17}{r['confidence']:>6.2f}{mark}")
+    print(f"\ntop-1 accuracy {report['top1_accuracy']:.0%}, coverage of pre-runnable prompts "
+          f"{report['coverage']:.0%}, accuracy when routed {report['routed_accuracy']:.0%}, "
+          f"classify p50 {report['p50_us']:.0f}us (max {report['max_us']:.0f}us)")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
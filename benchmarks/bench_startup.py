@@ -0,0 +1,69 @@
+"""Cold-start profile of the AgentCore runtime: import time and warmup stages.
+
+Each run is a fresh interpreter. Reports wall time to import the runtime module
+(what blocks the server from binding), the slowest top-level imports from
+`python -X importtime`, and the background warmup stage timings.
+
+Usage: python benchmarks/bench_startup.py [--module src.agentcore_runtime] [--top 10] [--json out.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+from src import warmup
+warmup.wait()
+print(json.dumps({{"import_seconds": imported, "ready_seconds": time.perf_counter() - start,
+                  "warmup": warmup.timings()}}))
+"""
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "unused")}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True)
+
+def import_profile(module: str, top: int) -> list:
+    """Slowest direct imports (cumulative ms) from -X importtime."""
+    stderr = _python("-X", "importtime", "-c", f"import {module}").stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+def run(module: str, top: int) -> dict:
+    probe = _python("-c", PROBE.format(module=module))
+    if probe.returncode:
+        raise SystemExit(probe.stderr)
+    report = json.loads(probe.stdout.strip().splitlines()[-1])
+    report["slowest_imports_ms"] = import_profile(module, top)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.agentcore_runtime")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    report = run(args.module, args.top)
+    print(f"import {args.module}: {report['import_seconds']:.2f}s, ready after {report['ready_seconds']:.2f}s")
+    print("warmup stages: " + ", ".join(f"{k} {v:.2f}s" for k, v in report["warmup"].items()))
+    print("slowest imports:")
+    for ms, name in report["slowest_imports_ms"]:
+        print(f"  {ms:8.0f} ms  {name}")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,61 @@
+"""Time to first token: streaming vs. the JSON response, against a stub LLM.
+
+The stub answers after --latency seconds and then emits one word every
+--token-latency seconds, roughly like a hosted model.
+
+Usage: python benchmarks/bench_streaming.py [--latency 0.5] [--token-latency 0.02] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain.agents import create_agent
+
+from benchmarks.fake_llm import FakeChatModel
+from src.streaming import iter_events
+from src.tools import TOOLS
+
+PROMPT = "How many customers have churned?"
+
+def run(agent, repeat: int) -> dict:
+    blocking, progress, first, full = [], [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        agent.invoke({"messages": [("human", PROMPT)]})
+        blocking.append(time.perf_counter() - start)
+
+        start, tool, ttft = time.perf_counter(), None, None
+        for event in iter_events(agent, {"messages": [("human", PROMPT)]}):
+            if tool is None and event["type"] == "tool_start":
+                tool = time.perf_counter() - start
+            if ttft is None and event["type"] == "token":
+                ttft = time.perf_counter() - start
+        progress.append(tool)
+        first.append(ttft)
+        full.append(time.perf_counter() - start)
+    return {
+        "json_response_ms": statistics.median(blocking) * 1000,
+        "stream_tool_progress_ms": statistics.median(progress) * 1000,
+        "stream_first_token_ms": statistics.median(first) * 1000,
+        "stream_done_ms": statistics.median(full) * 1000,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    model = FakeChatModel(latency_s=args.latency, token_latency_s=args.token_latency)
+    report = run(create_agent(model=model, tools=TOOLS), args.repeat)
+    for name, ms in report.items():
+        print(f"{name:<24}{ms:>9.0f} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
@@ -0,0 +1,39 @@
+"""Offline stand-in for the sentence-transformers model with a fixed CPU cost per text.
+
+Vectors are a deterministic function of the text, so documents and queries
+with the same text match. cost_s of busy work per text stands in for model
+compute. Plain (picklable) class with the Encoder interface of src.ingest, so
+it can run in embedding worker processes.
+"""
+import hashlib
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+class FakeEmbeddings(Embeddings):
+    """Hash-seeded unit vectors of size dim, burning cost_s of CPU per text."""
+
+    def __init__(self, dim: int = 384, cost_s: float = 0.0):
+        self.dim = dim
+        self.cost_s = cost_s
+
+    def load(self):
+        pass
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha1(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def __call__(self, texts: list) -> np.ndarray:
+        deadline = time.thread_time() + self.cost_s * len(texts)
+        while time.thread_time() < deadline:
+            pass
+        return np.stack([self._vector(text) for text in texts])
+
+    def embed_documents(self, texts: list) -> list:
+        return self(texts).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self._vector(text).tolist()
@@ -0,0 +1,94 @@
+"""Offline stand-in for the Groq chat model with a fixed per-call latency.
+
+The first call of a turn asks for a tool, the second answers from its output,
+matching the two round-trips of a real agent turn. input_token_latency_s adds
+a prefill cost proportional to the (approximate) prompt size. `script` picks
+the tool from the user's message: the first matching (regex, tool, args) wins,
+and "{prompt}" in an argument is replaced by the message text.
+"""
+import asyncio
+import json
+import re
+import time
+import uuid
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+DEFAULT_SQL = "SELECT COUNT(*) FROM customers WHERE churn='Yes'"
+
+class FakeChatModel(BaseChatModel):
+    """Tool-calling chat model that sleeps latency_s per call instead of calling an API."""
+
+    latency_s: float = 0.2
+    token_latency_s: float = 0.0
+    input_token_latency_s: float = 0.0
+    tool_name: str = "query_customers"
+    tool_args: dict = {"sql": DEFAULT_SQL}
+    script: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _prefill(self, messages) -> float:
+        if not self.input_token_latency_s:
+            return 0.0
+        return self.input_token_latency_s * count_tokens_approximately(messages)
+
+    def _tool_call(self, messages) -> tuple:
+        prompt = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        for pattern, name, args in self.script:
+            if re.search(pattern, prompt, re.IGNORECASE):
+                return name, {k: v.replace("{prompt}", prompt) if isinstance(v, str) else v for k, v in args.items()}
+        return self.tool_name, self.tool_args
+
+    def _reply(self, messages) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(f"Here is what I found:\n{messages[-1].content}")
+        else:
+            name, args = self._tool_call(messages)
+            call = {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+            message = AIMessage("", tool_calls=[call])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages) -> list:
+        """Answer split into word tokens; a tool call is a single chunk."""
+        message = self._reply(messages).generations[0].message
+        if message.tool_calls:
+            return [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": 0}
+                for c in message.tool_calls
+            ])]
+        return [AIMessageChunk(content=token) for token in re.findall(r"\S+\s*|\s+", message.content)]
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency_s + self._prefill(messages))
+        for chunk in self._chunks(messages):
+            time.sleep(self.token_latency_s)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_s + self._prefill(messages))
+        for chunk in self._chunks(messages):
+            await asyncio.sleep(self.token_latency_s)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_s + self._prefill(messages) + self.token_latency_s * len(self._chunks(messages)))
+        return self._reply(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(
+            self.latency_s + self._prefill(messages) + self.token_latency_s * len(self._chunks(messages))
+        )
+        return self._reply(messages)
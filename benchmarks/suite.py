@@ -0,0 +1,232 @@
+"""Offline latency/throughput suite: tools, the CLI agent and both AgentCore handlers.
+
+ChatGroq/init_chat_model are replaced by a deterministic stub (fake_llm) that
+picks tools from the prompt, and AgentCore Memory by in-memory stand-ins, so
+no API key or network is needed. Every target runs at each --concurrency;
+p50/p95/p99 latency, throughput and errors are reported per (scale, target,
+concurrency). Scales above 1 run against synthetic data (benchmarks/synthetic)
+built into a temporary DATA_DIR; each scale runs in a fresh interpreter. The
+answer and SQL result caches are off unless --caches is given.
+
+Usage:
+  python benchmarks/suite.py [--scale 1 10] [--concurrency 1 8 32] [--requests 200] [--out results.json]
+  python benchmarks/suite.py --compare baseline.json results.json [--tolerance 0.15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest import mock
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+ROOT = Path(__file__).parent.parent
+TARGETS = ("search_faq", "query_customers", "get_stats", "invoke", "runtime_handler", "memory_handler")
+
+PROMPTS = (
+    "How do I activate a new SIM?",
+    "How many customers have churned?",
+    "What is the average monthly charge for fiber customers?",
+    "Give me an overview of the customer base",
+    "Can I keep my number when switching providers?",
+    "Count customers on two year contracts",
+)
+SQL = (
+    "SELECT COUNT(*) FROM customers WHERE churn='Yes'",
+    "SELECT ROUND(AVG(monthly_charges),2) FROM customers WHERE internet_service='Fiber optic'",
+    "SELECT contract, COUNT(*) FROM customers GROUP BY contract",
+    "SELECT payment_method, AVG(churn='Yes') FROM customers GROUP BY payment_method",
+)
+# Tool the stub LLM calls for each prompt, like a well-behaved model would.
+SCRIPT = [
+    (r"overview|summary", "get_stats", {}),
+    (r"churned", "query_customers", {"sql": SQL[0]}),
+    (r"average", "query_customers", {"sql": SQL[1]}),
+    (r"count|how many", "query_customers", {"sql": SQL[2]}),
+    (r".", "search_faq", {"query": "{prompt}"}),
+]
+
+def summarize(latencies: list, errors: list, seconds: float) -> dict:
+    from src import metrics
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "throughput_rps": len(latencies) / seconds if seconds else 0.0,
+        **metrics.latency_percentiles(latencies),
+    }
+
+def _timed(call, i: int) -> tuple:
+    start = time.perf_counter()
+    try:
+        result = call(i)
+        error = result.get("error") if isinstance(result, dict) else None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return time.perf_counter() - start, error
+
+def run_sync(call, requests: int, concurrency: int) -> dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _timed(call, i), range(requests)))
+    return summarize([r[0] for r in results], [r[1] for r in results if r[1]], time.perf_counter() - start)
+
+async def _run_async(call, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await call(i)
+                error = result.get("error") if isinstance(result, dict) else None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            return time.perf_counter() - start, error
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize([r[0] for r in results], [r[1] for r in results if r[1]], time.perf_counter() - start)
+
+def run_async(call, requests: int, concurrency: int) -> dict:
+    return asyncio.run(_run_async(call, requests, concurrency))
+
+def _install_stubs(llm_latency: float):
+    """Swap the Groq client and AgentCore Memory for offline stand-ins before the agents are built."""
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.store.memory import InMemoryStore
+    from benchmarks.fake_llm import FakeChatModel
+
+    model = lambda *args, **kwargs: FakeChatModel(latency_s=llm_latency, script=SCRIPT)
+    for target in ("langchain_groq.ChatGroq", "langchain.chat_models.init_chat_model"):
+        mock.patch(target, model).start()
+    mock.patch("langgraph_checkpoint_aws.AgentCoreMemorySaver", lambda **kwargs: InMemorySaver()).start()
+    mock.patch("langgraph_checkpoint_aws.AgentCoreMemoryStore", lambda **kwargs: InMemoryStore()).start()
+
+def worker(targets: list, concurrency: list, requests: int, llm_latency: float) -> list:
+    """Run every target in this process (DATA_DIR already points at the dataset)."""
+    _install_stubs(llm_latency)
+    from src import warmup
+    warmup.run()
+    warmup._ready.set()
+    mock.patch("src.warmup.start", lambda extra=(): None).start()  # already warm; no second loader
+
+    from src.tools import get_stats, query_customers, search_faq
+    calls = {
+        "search_faq": (run_sync, lambda i: search_faq.invoke({"query": PROMPTS[i % len(PROMPTS)]})),
+        "query_customers": (run_sync, lambda i: query_customers.invoke({"sql": SQL[i % len(SQL)]})),
+        "get_stats": (run_sync, lambda i: get_stats.invoke({})),
+    }
+    if "invoke" in targets:
+        from src.agent import invoke
+        calls["invoke"] = (run_sync, lambda i: invoke(PROMPTS[i % len(PROMPTS)], thread_id=f"bench-{i}"))
+    if "runtime_handler" in targets:
+        from src import agentcore_runtime
+        calls["runtime_handler"] = (run_async, lambda i: agentcore_runtime.handler(
+            {"prompt": PROMPTS[i % len(PROMPTS)]}, {}))
+    if "memory_handler" in targets:
+        from src import agentcore_memory
+        calls["memory_handler"] = (run_async, lambda i: agentcore_memory.handler(
+            {"prompt": PROMPTS[i % len(PROMPTS)], "actor_id": "bench", "thread_id": f"bench-{i}"}, {}))
+
+    results = []
+    for target in targets:
+        runner, call = calls[target]
+        runner(call, min(requests, 10), 1)  # warm caches and lazy loads
+        for n in concurrency:
+            results.append({"target": target, "concurrency": n, **runner(call, requests, n)})
+    return results
+
+def run_scale(scale: int, faq_scale: int, args, tmp: Path) -> list:
+    """Run the worker in a fresh interpreter against the shipped data (scale 1) or a synthetic copy."""
+    env = {**os.environ, "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "unused")}
+    if not args.caches:
+        # The prompts repeat, so the answer and SQL result caches would otherwise serve most requests.
+        env.update(ANSWER_CACHE_SIZE="0", QUERY_CACHE_SIZE="0")
+    if scale != 1 or faq_scale != 1:
+        from benchmarks.synthetic import write_dataset
+        env["DATA_DIR"] = str(write_dataset(tmp / f"scale_{scale}", scale, faq_scale))
+    command = [sys.executable, __file__, "--worker", "--targets", *args.targets,
+               "--concurrency", *map(str, args.concurrency), "--requests", str(args.requests),
+               "--llm-latency", str(args.llm_latency)]
+    proc = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise SystemExit(f"scale {scale} failed:\n{proc.stderr[-4000:]}")
+    return [{"scale": scale, "faq_scale": faq_scale, **r} for r in json.loads(proc.stdout.strip().splitlines()[-1])]
+
+def _meta(args) -> dict:
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit.stdout.strip() or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "llm_latency_s": args.llm_latency,
+        "requests": args.requests,
+        "caches": args.caches,
+    }
+
+def compare(baseline: dict, current: dict, tolerance: float) -> int:
+    """Print per-row changes; returns the number of rows slower than baseline by more than tolerance.
+
+    Rows under 1 ms p50 are shown but never counted as regressions.
+    """
+    key = lambda r: (r["scale"], r["target"], r["concurrency"])
+    before = {key(r): r for r in baseline["results"]}
+    print(f"{'scale':>6} {'target':<17}{'conc':>5}{'p50 ms':>16}{'p99 ms':>16}{'req/s':>16}")
+    regressions = 0
+    for row in current["results"]:
+        old = before.get(key(row))
+        if old is None or not old["p50_ms"] or not row["p50_ms"]:
+            continue
+        change = lambda field: (row[field] - old[field]) / old[field]
+        slower = change("p50_ms") > tolerance or change("throughput_rps") < -tolerance
+        slower = slower and max(row["p50_ms"], old["p50_ms"]) >= 1.0  # sub-ms rows are mostly noise
+        regressions += slower
+        cells = "".join(f"{row[f]:>9.1f} {change(f):>+5.0%}" for f in ("p50_ms", "p99_ms", "throughput_rps"))
+        print(f"{row['scale']:>6} {row['target']:<17}{row['concurrency']:>5}{cells}{'  REGRESSION' if slower else ''}")
+    return regressions
+
+def print_results(results: list):
+    print(f"{'scale':>6} {'target':<17}{'conc':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'errors':>8}")
+    for r in results:
+        cells = "".join(f"{r[f]:>9.1f}" if r[f] is not None else f"{'-':>9}" for f in ("p50_ms", "p95_ms", "p99_ms"))
+        print(f"{r['scale']:>6} {r['target']:<17}{r['concurrency']:>5}{cells}{r['throughput_rps']:>9.1f}{r['errors']:>8}")
+    for r in results:
+        if r["errors"]:
+            print(f"  {r['target']} x{r['concurrency']}: {r['errors']} errors, e.g. {r['first_error'][:160]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="dataset size vs. the shipped CSVs")
+    parser.add_argument("--faq-scale", type=int, help="FAQ size multiplier (defaults to --scale)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=TARGETS)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub LLM seconds per call")
+    parser.add_argument("--caches", action="store_true", help="keep the answer and SQL result caches on")
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"))
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (json.loads(p.read_text()) for p in args.compare)
+        sys.exit(1 if compare(baseline, current, args.tolerance) else 0)
+    if args.worker:
+        results = worker(args.targets, args.concurrency, args.requests, args.llm_latency)
+        print(json.dumps(results))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [r for scale in args.scale for r in run_scale(scale, args.faq_scale or scale, args, Path(tmp))]
+    print_results(results)
+    if args.out:
+        args.out.write_text(json.dumps({"meta": _meta(args), "results": results}, indent=2))
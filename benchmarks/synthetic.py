@@ -0,0 +1,62 @@
+"""Synthetic datasets scaled up from the shipped CSVs."""
+import csv
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import get_settings
+
+DATA_DIR = Path(get_settings().data_dir)
+
+def write_customers_csv(path: Path, rows: int, seed: int = 0) -> Path:
+    """Write `rows` customers resampled from customers.csv with fresh unique IDs."""
+    rng = random.Random(seed)
+    with open(DATA_DIR / "customers.csv", newline="") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames
+        source = list(reader)
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for i in range(rows):
+            row = dict(rng.choice(source))
+            row["customerID"] = f"{i:010d}"
+            writer.writerow(row)
+    return path
+
+CONTEXTS = ("on a prepaid plan", "on a postpaid plan", "for a family account", "for an enterprise account",
+            "while roaming", "on 5G", "with a data-only plan", "after porting my number")
+
+def write_faq_csv(path: Path, scale: int) -> Path:
+    """Write qna.csv repeated `scale` times; copies get a context phrase so every question is unique."""
+    with open(DATA_DIR / "qna.csv", newline="", encoding="utf-8") as f:
+        source = list(csv.DictReader(f))
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["question", "answer"])
+        writer.writeheader()
+        for copy in range(scale):
+            context = f" {CONTEXTS[copy % len(CONTEXTS)]} (variant {copy})" if copy else ""
+            for row in source:
+                question = row["question"].rstrip("?") + context + "?"
+                writer.writerow({"question": question, "answer": row["answer"]})
+    return path
+
+def write_dataset(data_dir: Path, scale: int, faq_scale: int = None) -> Path:
+    """A data directory with customers.csv and qna.csv at `scale` times the shipped size."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    with open(DATA_DIR / "customers.csv", newline="") as f:
+        rows = sum(1 for _ in f) - 1
+    write_customers_csv(data_dir / "customers.csv", rows * scale)
+    write_faq_csv(data_dir / "qna.csv", faq_scale or scale)
+    return data_dir
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rows", type=int)
+    parser.add_argument("out", type=Path)
+    args = parser.parse_args()
+    write_customers_csv(args.out, args.rows)
@@ -7,33 +7,96 @@ sys.path.insert(0, str(Path(__file__).parent))
 def init():
     """Initialize data stores."""
     from src.data_loader import init_sqlite_db, build_vector_store
-    print("Building SQLite database...")
-    init_sqlite_db()
+    incremental = "--incremental" in sys.argv
+    print("Updating SQLite database..." if incremental else "Building SQLite database...")
+    stats = init_sqlite_db(incremental=incremental)
+    print(f"  {stats['rows']} rows in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec, {stats['upserted']} upserted, "
+          f"{stats['deleted']} deleted)")
     print("Building FAISS index...")
-    build_vector_store()
+    _, report = build_vector_store(rebuild="--rebuild" in sys.argv)
+    print(f"  {report['documents']} documents ({report['embedded']} embedded) in {report['seconds']:.2f}s")
     print("Done.")
 
+def build():
+    """Build image artifacts: SQLite DB, FAISS/BM25 indexes and the cached embedding model."""
+    import time
+    from src.data_loader import init_sqlite_db, build_vector_store
+    start = time.perf_counter()
+    stats = init_sqlite_db()
+    print(f"SQLite: {stats['rows']} rows in {stats['seconds']:.2f}s")
+    store, report = build_vector_store()
+    # Embedding once downloads the model into the image's HuggingFace cache.
+    store.embeddings.embed_query("warmup")
+    print(f"FAISS: {store.index.ntotal} vectors ({report['embedded']} embedded) in {report['seconds']:.2f}s")
+    print(f"Done in {time.perf_counter() - start:.1f}s.")
+
 def cli():
-    """Interactive CLI."""
-    from src.agent import invoke
+    """Interactive CLI; --stream prints tokens and tool progress as they arrive."""
+    from src.agent import invoke, stream
+    streaming = "--stream" in sys.argv
     print("Telecom Agent CLI - Type 'quit' to exit\n")
     while True:
         try:
             q = input("You: ").strip()
             if q.lower() in ('quit', 'exit', 'q'):
                 break
-            if q:
+            if not q:
+                continue
+            if not streaming:
                 print(f"\nAgent: {invoke(q)}\n")
+                continue
+            print("\nAgent: ", end="", flush=True)
+            for event in stream(q):
+                if event["type"] == "tool_start":
+                    print(f"[{event['tool']}...] ", end="", flush=True)
+                elif event["type"] == "token":
+                    print(event["content"], end="", flush=True)
+            print("\n")
         except (KeyboardInterrupt, EOFError):
             break
 
+def batch():
+    """Answer a JSONL/CSV file of prompts concurrently; rerunning resumes where it stopped."""
+    import argparse
+    from src.config import get_settings
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="main.py batch", description=batch.__doc__)
+    parser.add_argument("input", type=Path, help="JSONL with a prompt per line, or CSV with a prompt column")
+    parser.add_argument("--out", type=Path, help="results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=settings.batch_concurrency)
+    parser.add_argument("--rate", type=float, default=settings.batch_rate_limit, help="max requests/second")
+    parser.add_argument("--restart", action="store_true", help="overwrite the output instead of resuming")
+    args = parser.parse_args(sys.argv[2:])
+
+    from src.agent import get_agent, invoke
+    from src.batch import run_batch
+    get_agent()
+    out = args.out or args.input.with_suffix(".results.jsonl")
+    report = run_batch(args.input, out, lambda prompt, thread_id: invoke(prompt, thread_id=thread_id),
+                       args.concurrency, args.rate, resume=not args.restart)
+    print(f"{report['processed']} answered ({report['errors']} errors, {report['skipped']} skipped) "
+          f"in {report['seconds']:.1f}s: {report['throughput_rps']:.2f} req/s")
+    if report["processed"]:
+        print(f"latency p50 {report['p50_ms']:.0f} ms, p95 {report['p95_ms']:.0f} ms, "
+              f"p99 {report['p99_ms']:.0f} ms, max {report['max_ms']:.0f} ms")
+    print(f"Results: {out}")
+
 def serve():
-    """Run AgentCore server."""
+    """Run AgentCore server; WORKERS > 1 (or --workers N) pre-forks processes sharing the model."""
+    from src.config import get_settings
+    workers = get_settings().workers
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    if workers > 1:
+        from src.workers import serve as serve_workers
+        serve_workers("src.agentcore_runtime", workers)
+        return
     from src.agentcore_runtime import app
     app.run()
 
 if __name__ == "__main__":
-    cmds = {"init": init, "cli": cli, "serve": serve}
+    cmds = {"init": init, "build": build, "cli": cli, "batch": batch, "serve": serve}
     if len(sys.argv) < 2 or sys.argv[1] not in cmds:
         print(f"Usage: python main.py [{'/'.join(cmds.keys())}]")
         sys.exit(1)
@@ -1,8 +1,15 @@
 """Local agent for CLI testing."""
 from langchain_groq import ChatGroq
 from langchain.agents import create_agent
+from langchain_core.messages import AIMessage, HumanMessage
 from langgraph.checkpoint.memory import MemorySaver
+from src.answer_cache import answer_cacheable, cached_answer, get_answer_cache, store_answer, tools_cacheable
+from src.checkpointer import BoundedSaver
+from src.compaction import HistoryCompactionMiddleware
 from src.config import get_settings
+from src.instrumentation import ModelCallMetrics, request_trace
+from src.router import preroute
+from src.streaming import iter_events, tool_events
 from src.tools import TOOLS
 
 settings = get_settings()
@@ -31,6 +38,14 @@ Be concise and accurate."""
 _agent = None
 _memory = None
 
+def _checkpointer():
+    if settings.checkpointer == "memory":
+        return MemorySaver()
+    return BoundedSaver(
+        settings.checkpoint_max_threads, settings.checkpoint_max_mb * 2**20,
+        settings.checkpoint_ttl_s, settings.checkpoint_spill_path,
+    )
+
 def get_agent():
     global _agent, _memory
     if _agent is None:
@@ -39,16 +54,72 @@ def get_agent():
             api_key=settings.groq_api_key,
             temperature=0
         )
-        _memory = MemorySaver()
+        _memory = _checkpointer()
         _agent = create_agent(
             model=model,
             tools=TOOLS,
             checkpointer=_memory,
+            middleware=[
+                HistoryCompactionMiddleware(
+                    settings.history_token_budget, settings.history_keep_turns, settings.history_tool_chars
+                ),
+                ModelCallMetrics(),
+            ],
             system_prompt=SYSTEM_PROMPT
         )
     return _agent
 
 def invoke(query: str, thread_id: str = "default") -> str:
+    with request_trace("request"):
+        return _invoke(query, thread_id)
+
+def _invoke(query: str, thread_id: str) -> str:
+    config = {"configurable": {"thread_id": thread_id}}
+    agent = get_agent()
+    # Follow-ups depend on the conversation, so only opening questions are
+    # pre-routed or served from the answer cache. A cached turn is recorded as
+    # the model's reply so the thread is left at rest, not with a model step pending.
+    opening = not agent.get_state(config).values.get("messages")
+    cache = get_answer_cache() if opening else None
+    if cache is not None:
+        answer, version = cached_answer(cache, query)
+        if answer is not None:
+            agent.update_state(config, {"messages": [HumanMessage(query), AIMessage(answer)]}, as_node="model")
+            return answer
+    
+    messages = [("human", query)]
+    if opening and settings.router_enabled:
+        messages = preroute(query, TOOLS, settings.router_threshold)
+    result = agent.invoke({"messages": messages}, config=config)
+    answer = result["messages"][-1].content
+    if cache is not None and answer_cacheable(result["messages"]):
+        store_answer(cache, query, answer, version)
+    return answer
+
+def stream(query: str, thread_id: str = "default"):
+    """Like invoke, but yields token and tool-progress events (see src.streaming)."""
     config = {"configurable": {"thread_id": thread_id}}
-    result = get_agent().invoke({"messages": [("human", query)]}, config=config)
-    return result["messages"][-1].content
+    agent = get_agent()
+    opening = not agent.get_state(config).values.get("messages")
+    cache = get_answer_cache() if opening else None
+    if cache is not None:
+        answer, version = cached_answer(cache, query)
+        if answer is not None:
+            agent.update_state(config, {"messages": [HumanMessage(query), AIMessage(answer)]}, as_node="model")
+            yield {"type": "token", "content": answer}
+            yield {"type": "done", "result": answer}
+            return
+    
+    messages = [("human", query)]
+    if opening and settings.router_enabled:
+        messages = preroute(query, TOOLS, settings.router_threshold)
+    called = []
+    for event in tool_events(messages):
+        called += [event["tool"]] if event["type"] == "tool_start" else []
+        yield event
+    for event in iter_events(agent, {"messages": messages}, config):
+        if event["type"] == "tool_start":
+            called.append(event["tool"])
+        yield event
+    if cache is not None and tools_cacheable(called):
+        store_answer(cache, query, event["result"], version)
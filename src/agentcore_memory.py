@@ -1,7 +1,6 @@
 """AgentCore Runtime with AWS Memory persistence."""
 import os
 import sys
-import uuid
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -11,28 +10,24 @@ os.chdir(Path(__file__).parent.parent)
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain_core.runnables import RunnableConfig
 from langchain_groq import ChatGroq
 from langchain.chat_models import init_chat_model
 from langchain.agents import create_agent
-from langchain.agents.middleware import AgentMiddleware, AgentState
-from langgraph.store.base import BaseStore
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus
 from langgraph_checkpoint_aws import AgentCoreMemorySaver, AgentCoreMemoryStore
 
+from src import warmup
 from src.tools import TOOLS
 from src.config import get_settings
-from src.data_loader import init_sqlite_db, build_vector_store, DB_PATH, DATA_DIR
+from src.compaction import HistoryCompactionMiddleware
+from src.concurrency import ConcurrencyLimiter, Overloaded
+from src.instrumentation import ModelCallMetrics, mount, request_trace
+from src.memory_writer import MemoryMiddleware, MemoryWriter
+from src.streaming import aiter_events
 
 app = BedrockAgentCoreApp()
 settings = get_settings()
-
-# Initialize data on startup
-if not DB_PATH.exists():
-    init_sqlite_db()
-if not (DATA_DIR / "faiss_index").exists():
-    build_vector_store()
+mount(app)
 
 # Memory Configuration
 MEMORY_ID = "cc_memory-7VM1d2D7Kl"
@@ -40,6 +35,10 @@ MEMORY_ID = "cc_memory-7VM1d2D7Kl"
 # Initialize memory components
 checkpointer = AgentCoreMemorySaver(memory_id=MEMORY_ID, region_name=settings.aws_region)
 memory_store = AgentCoreMemoryStore(memory_id=MEMORY_ID, region_name=settings.aws_region)
+# Conversation events are written behind the response, batched per (actor_id, thread_id).
+memory_writer = MemoryWriter(
+    memory_store, settings.memory_batch_size, settings.memory_flush_interval_s, settings.memory_max_retries
+)
 
 SYSTEM_PROMPT = """You are a telecom customer service agent with hybrid retrieval and conversation memory.
 
@@ -51,32 +50,6 @@ TOOLS:
 Remember conversation context. Be concise and accurate."""
 
 
-class MemoryMiddleware(AgentMiddleware):
-    def pre_model_hook(self, state: AgentState, config: RunnableConfig, *, store: BaseStore) -> dict:
-        actor_id = config["configurable"].get("actor_id", "default")
-        thread_id = config["configurable"].get("thread_id", "default")
-        namespace = (actor_id, thread_id)
-        messages = state.get("messages", [])
-        
-        for msg in reversed(messages):
-            if isinstance(msg, HumanMessage):
-                store.put(namespace, str(uuid.uuid4()), {"message": msg.content, "type": "human"})
-                break
-        return {"messages": messages}
-    
-    def post_model_hook(self, state: AgentState, config: RunnableConfig, *, store: BaseStore) -> dict:
-        actor_id = config["configurable"].get("actor_id", "default")
-        thread_id = config["configurable"].get("thread_id", "default")
-        namespace = (actor_id, thread_id)
-        messages = state.get("messages", [])
-        
-        for msg in reversed(messages):
-            if isinstance(msg, AIMessage):
-                store.put(namespace, str(uuid.uuid4()), {"message": msg.content, "type": "ai"})
-                break
-        return state
-
-
 llm = init_chat_model(
     model=settings.llm_model,
     model_provider="groq",
@@ -88,13 +61,32 @@ agent = create_agent(
     tools=TOOLS,
     checkpointer=checkpointer,
     store=memory_store,
-    middleware=[MemoryMiddleware()],
+    middleware=[
+        HistoryCompactionMiddleware(
+            settings.history_token_budget, settings.history_keep_turns, settings.history_tool_chars
+        ),
+        MemoryMiddleware(memory_writer),
+        ModelCallMetrics(),
+    ],
     system_prompt=SYSTEM_PROMPT
 )
 
 
+limiter = ConcurrencyLimiter(
+    settings.max_concurrent_requests, settings.max_queued_requests, settings.queue_timeout_s
+)
+
+# Data artifacts, models and DB pages load in the background; ping reports busy until then.
+warmup.start()
+
+@app.ping
+def ping() -> PingStatus:
+    if not warmup.is_ready() or limiter.saturated:
+        return PingStatus.HEALTHY_BUSY
+    return PingStatus.HEALTHY
+
 @app.entrypoint
-def handler(payload: dict, context: dict) -> dict:
+async def handler(payload: dict, context: dict) -> dict:
     query = payload.get("prompt", "")
     if not query:
         return {"error": "No prompt provided", "result": ""}
@@ -103,17 +95,40 @@ def handler(payload: dict, context: dict) -> dict:
     thread_id = payload.get("thread_id", payload.get("session_id", context.get("session_id", "default")))
     
     config = {"configurable": {"thread_id": thread_id, "actor_id": actor_id}}
+    if payload.get("stream"):
+        return _stream(query, config)
     
     try:
-        result = agent.invoke({"messages": [("human", query)]}, config=config)
+        async with limiter:
+            await warmup.wait_ready()
+            with request_trace("request"):
+                result = await agent.ainvoke({"messages": [("human", query)]}, config=config)
         return {
             "result": result["messages"][-1].content,
             "actor_id": actor_id,
             "thread_id": thread_id
         }
+    except Overloaded as e:
+        return {"error": str(e), "result": "", "retryable": True}
     except Exception as e:
         return {"error": str(e), "result": ""}
 
 
+async def _stream(query: str, config: dict):
+    """Server-sent events for one request; the last event is done (or error)."""
+    configurable = config["configurable"]
+    try:
+        async with limiter:
+            await warmup.wait_ready()
+            async for event in aiter_events(agent, {"messages": [("human", query)]}, config):
+                if event["type"] == "done":
+                    event = {**event, "actor_id": configurable["actor_id"], "thread_id": configurable["thread_id"]}
+                yield event
+    except Overloaded as e:
+        yield {"type": "error", "error": str(e), "retryable": True}
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+
+
 if __name__ == "__main__":
     app.run()
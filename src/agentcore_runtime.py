@@ -10,22 +10,20 @@ os.chdir(Path(__file__).parent.parent)
 from dotenv import load_dotenv
 load_dotenv()
 
-from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from langchain_groq import ChatGroq
-from langchain.agents import create_agent
+from bedrock_agentcore.runtime import BedrockAgentCoreApp, PingStatus
 
+from src import warmup
 from src.tools import TOOLS
 from src.config import get_settings
-from src.data_loader import init_sqlite_db, build_vector_store, DB_PATH, DATA_DIR
+from src.answer_cache import answer_cacheable, cached_answer, get_answer_cache, store_answer, tools_cacheable
+from src.concurrency import ConcurrencyLimiter, Overloaded, run_blocking
+from src.router import apreroute
+from src.streaming import aiter_events, tool_events
+from src.instrumentation import mount, request_trace
 
 app = BedrockAgentCoreApp()
 settings = get_settings()
-
-# Initialize data on startup
-if not DB_PATH.exists():
-    init_sqlite_db()
-if not (DATA_DIR / "faiss_index").exists():
-    build_vector_store()
+mount(app)
 
 SYSTEM_PROMPT = """You are a telecom customer service agent with hybrid retrieval.
 
@@ -48,29 +46,105 @@ paperless_billing, payment_method, monthly_charges, total_charges, churn(Yes/No)
 
 Be concise and accurate."""
 
-model = ChatGroq(
-    model=settings.llm_model,
-    temperature=0,
-    api_key=settings.groq_api_key
-)
+_agent = None
+
+def get_agent():
+    """Build the agent on first use; the LLM client imports are the slowest part of startup."""
+    global _agent
+    if _agent is None:
+        from langchain_groq import ChatGroq
+        from langchain.agents import create_agent
+        from src.instrumentation import ModelCallMetrics
+        model = ChatGroq(
+            model=settings.llm_model,
+            temperature=0,
+            api_key=settings.groq_api_key
+        )
+        _agent = create_agent(
+            model=model,
+            tools=TOOLS,
+            middleware=[ModelCallMetrics()],
+            system_prompt=SYSTEM_PROMPT
+        )
+    return _agent
 
-agent = create_agent(
-    model=model,
-    tools=TOOLS,
-    system_prompt=SYSTEM_PROMPT
+limiter = ConcurrencyLimiter(
+    settings.max_concurrent_requests, settings.max_queued_requests, settings.queue_timeout_s
 )
 
+# Data artifacts, models and DB pages load in the background; ping reports busy until then.
+warmup.start(extra=(("agent", get_agent),))
+
+@app.ping
+def ping() -> PingStatus:
+    if not warmup.is_ready() or limiter.saturated:
+        return PingStatus.HEALTHY_BUSY
+    return PingStatus.HEALTHY
+
 @app.entrypoint
-def handler(payload: dict, context: dict) -> dict:
+async def handler(payload: dict, context: dict) -> dict:
     query = payload.get("prompt", "")
     if not query:
         return {"error": "No prompt provided", "result": ""}
+    if payload.get("stream"):
+        return _stream(query)
     
     try:
-        result = agent.invoke({"messages": [("human", query)]})
-        return {"result": result["messages"][-1].content}
+        async with limiter:
+            with request_trace("request"):
+                return await _answer(query)
+    except Overloaded as e:
+        return {"error": str(e), "result": "", "retryable": True}
     except Exception as e:
         return {"error": str(e), "result": ""}
 
+async def _answer(query: str) -> dict:
+    await warmup.wait_ready()
+    cache = get_answer_cache()
+    if cache is not None:
+        answer, version = await run_blocking(cached_answer, cache, query)
+        if answer is not None:
+            return {"result": answer, "cached": True}
+    
+    messages = [("human", query)]
+    if settings.router_enabled:
+        messages = await apreroute(query, TOOLS, settings.router_threshold)
+    result = await get_agent().ainvoke({"messages": messages})
+    answer = result["messages"][-1].content
+    if cache is not None and answer_cacheable(result["messages"]):
+        await run_blocking(store_answer, cache, query, answer, version)
+    return {"result": answer}
+
+async def _stream(query: str):
+    """Server-sent events for one request; the last event is done (or error)."""
+    try:
+        async with limiter:
+            await warmup.wait_ready()
+            cache = get_answer_cache()
+            if cache is not None:
+                answer, version = await run_blocking(cached_answer, cache, query)
+                if answer is not None:
+                    yield {"type": "token", "content": answer}
+                    yield {"type": "done", "result": answer, "cached": True}
+                    return
+            
+            messages = [("human", query)]
+            if settings.router_enabled:
+                messages = await apreroute(query, TOOLS, settings.router_threshold)
+            called = []
+            for event in tool_events(messages):
+                called += [event["tool"]] if event["type"] == "tool_start" else []
+                yield event
+            async for event in aiter_events(get_agent(), {"messages": messages}):
+                if event["type"] == "tool_start":
+                    called.append(event["tool"])
+                yield event
+            if cache is not None and tools_cacheable(called):
+                await run_blocking(store_answer, cache, query, event["result"], version)
+    except Overloaded as e:
+        yield {"type": "error", "error": str(e), "retryable": True}
+    except Exception as e:
+        yield {"type": "error", "error": str(e)}
+
 if __name__ == "__main__":
     app.run()
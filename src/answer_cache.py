@@ -0,0 +1,142 @@
+"""Semantic cache of final agent answers to FAQ-style prompts."""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src import metrics
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_TOOLS = frozenset({"search_faq"})
+
+def answer_cacheable(messages: list) -> bool:
+    """True when the answer came from FAQ lookups only.
+
+    Answers built from customer data are left out: prompts that differ only in a
+    filter value ("one year" vs "two year") embed almost identically.
+    """
+    return tools_cacheable(call["name"] for m in messages for call in getattr(m, "tool_calls", None) or [])
+
+def tools_cacheable(names) -> bool:
+    """answer_cacheable for the names of the tools a run called."""
+    called = set(names)
+    return bool(called) and called <= CACHEABLE_TOOLS
+
+class SemanticAnswerCache:
+    """LRU + TTL cache of answers looked up by cosine similarity of prompt embeddings.
+
+    Entries belong to one knowledge version (customer DB + FAQ index); a lookup
+    under a new version drops everything cached before the rebuild.
+    """
+
+    def __init__(self, embed, threshold: float = 0.92, max_entries: int = 512, ttl_s: float = 3600.0):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()  # prompt -> (unit vector, answer, expires)
+        self._matrix = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _vector(self, prompt: str):
+        vector = np.asarray(self.embed(prompt), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                metrics.incr("answer_cache.invalidated", len(self._entries))
+            self._entries.clear()
+            self._matrix = None
+            self._version = version
+
+    def get(self, prompt: str, version):
+        """Cached answer for the most similar prompt above the threshold, else None."""
+        vector = self._vector(prompt)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            expired = [key for key, entry in self._entries.items() if entry[2] < now]
+            for key in expired:
+                del self._entries[key]
+            if expired:
+                self._matrix = None
+            answer = None
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix = np.stack([entry[0] for entry in self._entries.values()])
+                scores = self._matrix @ vector
+                best = int(scores.argmax())
+                if scores[best] >= self.threshold:
+                    key = list(self._entries)[best]
+                    answer = self._entries[key][1]
+                    self._entries.move_to_end(key)
+                    self._matrix = None
+        metrics.incr("answer_cache.hit" if answer is not None else "answer_cache.miss")
+        return answer
+
+    def put(self, prompt: str, answer: str, version):
+        vector = self._vector(prompt)
+        with self._lock:
+            self._check_version(version)
+            self._entries[prompt] = (vector, answer, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(prompt)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.incr("answer_cache.evicted")
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def __len__(self):
+        return len(self._entries)
+
+_cache = None
+
+def get_answer_cache():
+    """Process-wide cache over the search_faq query embeddings, or None when disabled."""
+    global _cache
+    settings = get_settings()
+    if not settings.answer_cache_size:
+        return None
+    if _cache is None:
+        from src.tools import embed_query
+        _cache = SemanticAnswerCache(
+            embed_query, settings.answer_cache_threshold, settings.answer_cache_size, settings.answer_cache_ttl_s
+        )
+    return _cache
+
+def cached_answer(cache, prompt: str) -> tuple:
+    """(answer or None, knowledge version) for an opening prompt.
+
+    The cache is only an optimization: if embedding the prompt or reading the
+    knowledge version fails, the error is logged and counted and the request
+    goes on to the agent as a miss, with version None so nothing is stored.
+    """
+    try:
+        from src.data_loader import get_knowledge_version
+        version = get_knowledge_version()
+        return cache.get(prompt, version), version
+    except Exception:
+        logger.exception("Answer cache lookup failed; answering without it")
+        metrics.incr("answer_cache.error")
+        return None, None
+
+def store_answer(cache, prompt: str, answer: str, version):
+    """cache.put, skipped after a failed lookup; a failure is logged and counted, never raised."""
+    if version is None:
+        return
+    try:
+        cache.put(prompt, answer, version)
+    except Exception:
+        logger.exception("Answer cache store failed")
+        metrics.incr("answer_cache.error")
@@ -0,0 +1,139 @@
+"""Run a file of prompts through the agent concurrently, with resumable output.
+
+Input is JSONL (one object per line with "prompt" and optional "id" and
+"thread_id") or CSV (a "prompt" or "question" column, optional "id"). Rows
+are read lazily. Each row runs on its own conversation thread, so answers
+never see another row's history. Results are appended to a JSONL file as
+they finish; a rerun skips rows already answered and retries failed ones.
+"""
+import csv
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+def read_prompts(path: Path):
+    """Yield {"id", "prompt", "thread_id"} rows; ids default to the row number."""
+    path = Path(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for n, row in enumerate(rows, 1):
+            prompt = (row.get("prompt") or row.get("question") or "").strip()
+            row_id = str(row.get("id") or n)
+            yield {"id": row_id, "prompt": prompt, "thread_id": row.get("thread_id") or f"batch-{row_id}"}
+
+def completed_ids(path: Path) -> set:
+    """Ids answered without error in an existing output file (a torn last line is ignored)."""
+    done = set()
+    if not Path(path).exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not record.get("error"):
+                done.add(record["id"])
+    return done
+
+def _torn(path: Path) -> bool:
+    """True when the file's last line was cut off mid-write."""
+    path = Path(path)
+    if not path.exists() or not path.stat().st_size:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) != b"\n"
+
+class RateLimiter:
+    """Spaces calls at most ``rate`` per second across threads (0 disables)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def summarize(latencies: list, errors: int, skipped: int, seconds: float) -> dict:
+    return {
+        "processed": len(latencies),
+        "errors": errors,
+        "skipped": skipped,
+        "seconds": seconds,
+        "throughput_rps": len(latencies) / seconds if seconds else 0.0,
+        **metrics.latency_percentiles(latencies),
+        "max_ms": max(latencies) * 1000 if latencies else None,
+    }
+
+def run_batch(input_path: Path, output_path: Path, invoke, concurrency: int = 8,
+              rate: float = 0.0, resume: bool = True) -> dict:
+    """Answer every row of input_path with invoke(prompt, thread_id); returns summarize()'s report.
+
+    At most ``concurrency`` rows run at once and only twice that many are read
+    ahead, so memory stays flat for any input size. Each result line is
+    flushed as soon as the row finishes.
+    """
+    done = completed_ids(output_path) if resume else set()
+    torn = resume and _torn(output_path)
+
+    limiter = RateLimiter(rate)
+    slots = threading.BoundedSemaphore(concurrency * 2)
+    write_lock = threading.Lock()
+    latencies, errors, skipped = [], 0, 0
+
+    def answer(row: dict) -> dict:
+        limiter.wait()
+        start = time.perf_counter()
+        try:
+            result, error = invoke(row["prompt"], row["thread_id"]), None
+        except Exception as e:
+            result, error = "", f"{type(e).__name__}: {e}"
+        return {**row, "result": result, "error": error, "latency_ms": (time.perf_counter() - start) * 1000}
+
+    out = open(output_path, "a" if resume else "w", encoding="utf-8")
+    with out, ThreadPoolExecutor(concurrency) as pool:
+        if torn:
+            out.write("\n")
+
+        def finish(future):
+            nonlocal errors
+            record = future.result()
+            with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                latencies.append(record["latency_ms"] / 1000)
+                if record["error"]:
+                    errors += 1
+                    logger.warning("Row %s failed: %s", record["id"], record["error"])
+            metrics.observe("batch.request_seconds", record["latency_ms"] / 1000)
+            slots.release()
+
+        start = time.perf_counter()
+        for row in read_prompts(input_path):
+            if row["id"] in done or not row["prompt"]:
+                skipped += 1
+                continue
+            slots.acquire()
+            pool.submit(answer, row).add_done_callback(finish)
+        pool.shutdown(wait=True)
+        seconds = time.perf_counter() - start
+    return summarize(latencies, errors, skipped, seconds)
@@ -0,0 +1,240 @@
+"""Bounded in-process checkpointer: latest checkpoint per thread, idle threads evicted."""
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP, BaseCheckpointSaver, CheckpointTuple, get_checkpoint_id, get_checkpoint_metadata
+)
+
+from src import metrics
+
+class _Thread:
+    """Serialized state of one thread: per checkpoint namespace, the latest checkpoint only."""
+
+    __slots__ = ("namespaces", "nbytes", "touched")
+
+    def __init__(self, namespaces: dict = None):
+        # ns -> {"id", "checkpoint", "metadata", "parent", "blobs": {channel: (version, typed)},
+        #        "writes": {(task_id, idx): (task_id, channel, typed, task_path)}}
+        self.namespaces = namespaces or {}
+        self.nbytes = 0
+        self.touched = time.monotonic()
+
+    def measure(self) -> int:
+        size = 0
+        for record in self.namespaces.values():
+            size += len(record["checkpoint"][1]) + len(record["metadata"][1])
+            size += sum(len(typed[1]) for _, typed in record["blobs"].values())
+            size += sum(len(w[2][1]) for w in record["writes"].values())
+        self.nbytes = size
+        return size
+
+class BoundedSaver(BaseCheckpointSaver):
+    """MemorySaver replacement whose memory does not grow with the number of threads.
+
+    Only each thread's latest checkpoint (and its pending writes) is kept, so
+    history/time travel is unavailable. Threads are evicted least recently
+    used first when there are more than ``max_threads``, when their serialized
+    size exceeds ``max_bytes`` in total, or after ``ttl_s`` idle. With
+    ``spill_path`` set, evicted threads are written to a SQLite file and
+    reloaded transparently when they are next used; without it they are
+    forgotten. Publishes checkpointer.threads and checkpointer.bytes gauges.
+    """
+
+    def __init__(self, max_threads: int = 10_000, max_bytes: int = 256 * 2**20, ttl_s: float = 0,
+                 spill_path: str = "", *, serde=None):
+        super().__init__(serde=serde)
+        self.max_threads = max_threads
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self._threads = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._spill = None
+        if spill_path:
+            Path(spill_path).parent.mkdir(parents=True, exist_ok=True)
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+            self._spill.execute("PRAGMA journal_mode=WAL")
+            self._spill.execute("PRAGMA synchronous=NORMAL")
+            self._spill.execute("CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, data BLOB)")
+
+    # Thread residency
+
+    def _get(self, thread_id: str, create: bool = False) -> _Thread:
+        """The in-memory thread, reloading it from the spill file if it was evicted."""
+        thread = self._threads.get(thread_id)
+        if thread is None and self._spill is not None:
+            row = self._spill.execute("SELECT data FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+            if row:
+                thread = _Thread(pickle.loads(row[0]))
+                self._bytes += thread.measure()
+                self._threads[thread_id] = thread
+                # Resident again: the spilled copy would go stale and count as spilled.
+                self._spill.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+                metrics.incr("checkpointer.reloaded")
+        if thread is None and create:
+            thread = self._threads[thread_id] = _Thread()
+        if thread is not None:
+            thread.touched = time.monotonic()
+            self._threads.move_to_end(thread_id)
+        return thread
+
+    def _resize(self, thread: _Thread):
+        self._bytes -= thread.nbytes
+        self._bytes += thread.measure()
+
+    def _evict(self, keep: str = None):
+        """Evict idle, then least recently used threads until within bounds; never `keep`."""
+        now = time.monotonic()
+        for thread_id, thread in list(self._threads.items()):
+            over = len(self._threads) > self.max_threads or self._bytes > self.max_bytes
+            idle = self.ttl_s and now - thread.touched > self.ttl_s
+            if not (over or idle):
+                break  # LRU order: every later thread is more recent
+            if thread_id == keep:
+                continue
+            del self._threads[thread_id]
+            self._bytes -= thread.nbytes
+            if self._spill is not None:
+                self._spill.execute("INSERT OR REPLACE INTO threads VALUES (?, ?)",
+                                    (thread_id, pickle.dumps(thread.namespaces, pickle.HIGHEST_PROTOCOL)))
+            metrics.incr("checkpointer.evicted")
+        metrics.gauge("checkpointer.threads", len(self._threads))
+        metrics.gauge("checkpointer.bytes", self._bytes)
+
+    def stats(self) -> dict:
+        with self._lock:
+            spilled = self._spill.execute("SELECT COUNT(*) FROM threads").fetchone()[0] if self._spill else 0
+            return {"threads": len(self._threads), "bytes": self._bytes, "spilled": spilled}
+
+    # BaseCheckpointSaver
+
+    def _tuple(self, thread_id: str, ns: str, record: dict) -> CheckpointTuple:
+        checkpoint = self.serde.loads_typed(record["checkpoint"])
+        checkpoint["channel_values"] = {
+            channel: self.serde.loads_typed(typed)
+            for channel, (version, typed) in record["blobs"].items()
+            if typed[0] != "empty" and checkpoint["channel_versions"].get(channel) == version
+        }
+        parent = record["parent"]
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": record["id"]}},
+            checkpoint=checkpoint,
+            metadata=self.serde.loads_typed(record["metadata"]),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent}}
+                if parent else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(typed))
+                            for task_id, channel, typed, _ in record["writes"].values()],
+        )
+
+    def get_tuple(self, config):
+        configurable = config["configurable"]
+        ns = configurable.get("checkpoint_ns", "")
+        with self._lock:
+            thread = self._get(configurable["thread_id"])
+            self._evict(keep=configurable["thread_id"])
+            record = thread.namespaces.get(ns) if thread else None
+            if record is None:
+                return None
+            checkpoint_id = get_checkpoint_id(config)
+            if checkpoint_id and checkpoint_id != record["id"]:
+                return None  # superseded checkpoints are not kept
+            return self._tuple(configurable["thread_id"], ns, record)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            if config:
+                thread_ids = [config["configurable"]["thread_id"]]
+            else:
+                thread_ids = list(self._threads)
+                if self._spill is not None:
+                    thread_ids += [r[0] for r in self._spill.execute("SELECT thread_id FROM threads")
+                                   if r[0] not in self._threads]
+            wanted_ns = config["configurable"].get("checkpoint_ns") if config else None
+            wanted_id = get_checkpoint_id(config) if config else None
+            before_id = get_checkpoint_id(before) if before else None
+            found = []
+            for thread_id in thread_ids:
+                thread = self._get(thread_id)
+                for ns, record in (thread.namespaces.items() if thread else ()):
+                    if wanted_ns is not None and ns != wanted_ns:
+                        continue
+                    if (wanted_id and record["id"] != wanted_id) or (before_id and record["id"] >= before_id):
+                        continue
+                    item = self._tuple(thread_id, ns, record)
+                    if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                        continue
+                    found.append(item)
+            self._evict()
+        yield from found[:limit] if limit is not None else found
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        configurable = config["configurable"]
+        thread_id, ns = configurable["thread_id"], configurable.get("checkpoint_ns", "")
+        values = checkpoint["channel_values"]
+        stored = {k: v for k, v in checkpoint.items() if k != "channel_values"}
+        with self._lock:
+            thread = self._get(thread_id, create=True)
+            previous = thread.namespaces.get(ns)
+            blobs = dict(previous["blobs"]) if previous else {}
+            for channel, version in new_versions.items():
+                blobs[channel] = (version, self.serde.dumps_typed(values[channel]) if channel in values
+                                  else ("empty", b""))
+            versions = checkpoint["channel_versions"]
+            thread.namespaces[ns] = {
+                "id": checkpoint["id"],
+                "checkpoint": self.serde.dumps_typed(stored),
+                "metadata": self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                "parent": configurable.get("checkpoint_id"),
+                "blobs": {c: b for c, b in blobs.items() if c in versions},
+                "writes": {},  # writes of the superseded checkpoint are already applied
+            }
+            self._resize(thread)
+            self._evict(keep=thread_id)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        configurable = config["configurable"]
+        with self._lock:
+            thread = self._get(configurable["thread_id"])
+            record = thread.namespaces.get(configurable.get("checkpoint_ns", "")) if thread else None
+            if record is None or record["id"] != configurable["checkpoint_id"]:
+                return  # writes against a superseded checkpoint
+            for idx, (channel, value) in enumerate(writes):
+                key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if key[1] >= 0 and key in record["writes"]:
+                    continue
+                record["writes"][key] = (task_id, channel, self.serde.dumps_typed(value), task_path)
+            self._resize(thread)
+            self._evict(keep=configurable["thread_id"])
+
+    def delete_thread(self, thread_id: str):
+        with self._lock:
+            thread = self._threads.pop(thread_id, None)
+            if thread is not None:
+                self._bytes -= thread.nbytes
+            if self._spill is not None:
+                self._spill.execute("DELETE FROM threads WHERE thread_id = ?", (thread_id,))
+            self._evict()
+
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str):
+        return self.delete_thread(thread_id)
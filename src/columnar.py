@@ -0,0 +1,374 @@
+"""Optional in-memory columnar engine for simple aggregate queries.
+
+Loads the customers table into NumPy arrays, with text columns dictionary-encoded
+to small ints, and answers ``SELECT <group cols/aggregates> FROM customers
+[WHERE ...] [GROUP BY ...]`` vectorized. ``execute`` returns None for anything
+outside that subset so callers fall back to SQLite.
+"""
+import math
+import re
+import threading
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from src import metrics
+
+NUMERIC = {"senior_citizen": np.int8, "tenure": np.int32,
+           "monthly_charges": np.float64, "total_charges": np.float64}
+CATEGORICAL = ("gender", "partner", "dependents", "phone_service", "multiple_lines",
+               "internet_service", "online_security", "online_backup", "device_protection",
+               "tech_support", "streaming_tv", "streaming_movies", "contract",
+               "paperless_billing", "payment_method", "churn")
+AGGREGATES = ("COUNT", "SUM", "AVG", "MIN", "MAX")
+LOAD_CHUNK = 100_000
+MAX_GROUP_CELLS = 50_000_000
+
+_TOKEN = re.compile(r"\s*(?:('(?:[^']|'')*')|(\d+\.?\d*|\.\d+)|(\w+)|(<=|>=|!=|<>|==|[=<>(),*]))")
+
+class _Unsupported(Exception):
+    pass
+
+def _tokenize(sql: str):
+    """Yield (kind, value, start, end); raises _Unsupported on anything unexpected."""
+    pos, sql = 0, sql.rstrip().rstrip(";")
+    while pos < len(sql):
+        m = _TOKEN.match(sql, pos)
+        if not m or m.end() == pos:
+            if sql[pos:].strip() == "":
+                break
+            raise _Unsupported(sql[pos:pos + 10])
+        string, number, word, op = m.groups()
+        start = m.start(m.lastindex)
+        if string is not None:
+            yield "str", string[1:-1].replace("''", "'"), start, m.end()
+        elif number is not None:
+            yield "num", float(number) if "." in number else int(number), start, m.end()
+        elif word is not None:
+            yield "word", word, start, m.end()
+        else:
+            yield "op", op, start, m.end()
+        pos = m.end()
+
+class _Parser:
+    """Recursive-descent parser for the supported SELECT subset."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.tokens = list(_tokenize(sql))
+        self.i = 0
+
+    def peek(self, offset=0):
+        j = self.i + offset
+        return self.tokens[j] if j < len(self.tokens) else (None, None, len(self.sql), len(self.sql))
+
+    def keyword(self, *words) -> bool:
+        kind, value, _, _ = self.peek()
+        if kind == "word" and value.upper() in words:
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, kind, value=None):
+        tok = self.peek()
+        if tok[0] != kind or (value is not None and str(tok[1]).upper() != value):
+            raise _Unsupported(f"expected {value or kind}")
+        self.i += 1
+        return tok
+
+    def column(self) -> str:
+        _, name, _, _ = self.expect("word")
+        name = name.lower()
+        if name not in NUMERIC and name not in CATEGORICAL:
+            raise _Unsupported(name)
+        return name
+
+    def select_item(self):
+        start = self.peek()[2]
+        kind, value, _, _ = self.peek()
+        digits = None
+        if kind == "word" and value.upper() == "ROUND" and self.peek(1)[1] == "(":
+            self.i += 2
+            func, arg = self.aggregate()
+            digits = 0
+            if self.peek()[1] == ",":
+                self.i += 1
+                digits = self.expect("num")[1]
+            self.expect("op", ")")
+            item = ("agg", func, arg, digits)
+        elif kind == "word" and value.upper() in AGGREGATES and self.peek(1)[1] == "(":
+            func, arg = self.aggregate()
+            item = ("agg", func, arg, None)
+        else:
+            item = ("col", self.column())
+        name = self.sql[start:self.tokens[self.i - 1][3]]
+        if self.keyword("AS"):
+            name = self.expect("word")[1]
+        return item, name
+
+    def aggregate(self):
+        func = self.expect("word")[1].upper()
+        self.expect("op", "(")
+        if self.peek()[1] == "*":
+            if func != "COUNT":
+                raise _Unsupported(func)
+            self.i += 1
+            arg = None
+        else:
+            arg = self.column()
+            if func != "COUNT" and arg not in NUMERIC:
+                raise _Unsupported(f"{func} on text")
+        self.expect("op", ")")
+        return func, arg
+
+    def literal(self):
+        kind, value, _, _ = self.peek()
+        if kind not in ("str", "num"):
+            raise _Unsupported("literal")
+        self.i += 1
+        return value
+
+    def condition(self):
+        col = self.column()
+        if self.keyword("IN"):
+            self.expect("op", "(")
+            values = [self.literal()]
+            while self.peek()[1] == ",":
+                self.i += 1
+                values.append(self.literal())
+            self.expect("op", ")")
+            return (col, "IN", values)
+        if self.keyword("BETWEEN"):
+            low = self.literal()
+            self.expect("word", "AND")
+            return (col, "BETWEEN", (low, self.literal()))
+        op = self.expect("op")[1]
+        if op not in ("=", "==", "!=", "<>", "<", "<=", ">", ">="):
+            raise _Unsupported(op)
+        return (col, op, self.literal())
+
+    def parse(self):
+        self.expect("word", "SELECT")
+        items = [self.select_item()]
+        while self.peek()[1] == ",":
+            self.i += 1
+            items.append(self.select_item())
+        self.expect("word", "FROM")
+        if self.expect("word")[1].lower() != "customers":
+            raise _Unsupported("table")
+        conditions, groups = [], []
+        if self.keyword("WHERE"):
+            conditions.append(self.condition())
+            while self.keyword("AND"):
+                conditions.append(self.condition())
+        if self.keyword("GROUP"):
+            self.expect("word", "BY")
+            groups.append(self.column())
+            while self.peek()[1] == ",":
+                self.i += 1
+                groups.append(self.column())
+        if self.peek()[0] is not None:
+            raise _Unsupported(str(self.peek()[1]))
+        return items, conditions, groups
+
+def parse(sql: str):
+    """Parse sql into (items, conditions, groups), or None if unsupported."""
+    try:
+        return _Parser(sql).parse()
+    except _Unsupported:
+        return None
+
+class _Codes(dict):
+    """Value -> code mapping that assigns the next code to unseen values."""
+
+    def __missing__(self, value):
+        code = self[value] = len(self)
+        return code
+
+def _python(value, col):
+    if value is None:
+        return None
+    return int(value) if col in NUMERIC and NUMERIC[col] != np.float64 else float(value)
+
+def _sql_round(value: float, digits: int, exact: bool) -> float:
+    """ROUND(value, digits) as SQLite computes it: ties go away from zero, not to even.
+
+    For a SUM or AVG (exact=False) a tie is only a tie up to summation order,
+    which differs between NumPy and SQLite, so near-ties raise _Unsupported and
+    the query goes to SQLite.
+    """
+    scaled = abs(float(value)) * 10.0 ** digits
+    if not exact and abs(scaled - math.floor(scaled) - 0.5) <= 1e-9 * max(1.0, scaled):
+        raise _Unsupported("ROUND of an inexact tie")
+    return float(Decimal(repr(float(value))).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP))
+
+class ColumnarEngine:
+    """Columns as NumPy arrays; text columns stored as codes into sorted dictionaries."""
+
+    def __init__(self, columns: dict, dictionaries: dict, version: str | None = None):
+        self.columns = columns
+        self.dictionaries = dictionaries
+        self.version = version
+        self.rows = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_sqlite(cls, conn, version: str | None = None) -> "ColumnarEngine":
+        """Load customers from SQLite in chunks, dictionary-encoding text columns."""
+        names = list(NUMERIC) + list(CATEGORICAL)
+        cur = conn.execute(f"SELECT {', '.join(names)} FROM customers ORDER BY rowid")
+        chunks = {name: [] for name in names}
+        lookups = {name: _Codes() for name in CATEGORICAL}
+        while True:
+            batch = cur.fetchmany(LOAD_CHUNK)
+            if not batch:
+                break
+            for name, values in zip(names, zip(*batch)):
+                if name in NUMERIC:
+                    chunks[name].append(np.array(values, dtype=NUMERIC[name]))
+                else:
+                    chunks[name].append(np.fromiter(
+                        map(lookups[name].__getitem__, values), dtype=np.int16, count=len(values)
+                    ))
+        cur.close()
+
+        columns, dictionaries = {}, {}
+        for name in names:
+            data = np.concatenate(chunks[name]) if chunks[name] else np.empty(0, NUMERIC.get(name, np.int16))
+            if name in CATEGORICAL:
+                # Re-code so code order matches SQLite's BINARY text order.
+                values = sorted(lookups[name])
+                remap = np.zeros(max(len(values), 1), dtype=np.int16)
+                remap[[lookups[name][v] for v in values]] = np.arange(len(values))
+                data = remap[data].astype(np.int8 if len(values) < 128 else np.int16)
+                dictionaries[name] = values
+            columns[name] = data
+        return cls(columns, dictionaries, version)
+
+    def _mask(self, conditions):
+        """Boolean row mask for ANDed conditions, or None when there are none."""
+        mask = None
+        for col, op, value in conditions:
+            data = self.columns[col]
+            values = value if op in ("IN", "BETWEEN") else [value]
+            if col in CATEGORICAL:
+                if any(not isinstance(v, str) for v in values) or op not in ("=", "==", "!=", "<>", "IN"):
+                    raise _Unsupported("text comparison")
+                lookup = self.dictionaries[col]
+                hit = np.zeros(self.rows, dtype=bool)
+                for v in values:
+                    if v in lookup:
+                        hit |= data == lookup.index(v)
+                if op in ("!=", "<>"):
+                    hit = ~hit
+            else:
+                if any(isinstance(v, str) for v in values):
+                    raise _Unsupported("numeric vs text")
+                if op == "IN":
+                    hit = np.isin(data, values)
+                elif op == "BETWEEN":
+                    hit = (data >= value[0]) & (data <= value[1])
+                else:
+                    hit = {
+                        "=": np.equal, "==": np.equal, "!=": np.not_equal, "<>": np.not_equal,
+                        "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+                    }[op](data, value)
+            mask = hit if mask is None else mask & hit
+        return mask
+
+    def _groups(self, groups, select):
+        """Dense group ids, per-group counts and each group's key levels."""
+        dims, parts, levels = [], [], []
+        for g in groups:
+            data = select(self.columns[g])
+            if g in CATEGORICAL:
+                values, part = np.arange(len(self.dictionaries[g])), data.astype(np.intp)
+            else:
+                values, part = np.unique(data, return_inverse=True)
+            dims.append(max(len(values), 1))
+            parts.append(part)
+            levels.append(values)
+        if np.prod(dims, dtype=np.float64) > MAX_GROUP_CELLS:
+            raise _Unsupported("too many groups")
+        combined = np.ravel_multi_index(parts, dims) if len(parts) > 1 else parts[0]
+        counts = np.bincount(combined, minlength=int(np.prod(dims)))
+        present = np.flatnonzero(counts)
+        dense = np.zeros(len(counts), dtype=np.intp)
+        dense[present] = np.arange(len(present))
+        keys = np.unravel_index(present, dims)
+        return dense[combined], counts[present], [lv[k] for lv, k in zip(levels, keys)]
+
+    def _aggregate(self, func, col, select, gid, counts):
+        n = len(counts)
+        if func == "COUNT":
+            return [int(c) for c in counts]
+        values = select(self.columns[col])
+        if gid is None:
+            if not len(values):
+                return [None]
+            result = {"SUM": np.sum, "AVG": np.mean, "MIN": np.min, "MAX": np.max}[func](values)
+            return [float(result) if func == "AVG" else _python(result, col)]
+        if func in ("SUM", "AVG"):
+            sums = np.bincount(gid, weights=values, minlength=n)
+            if func == "AVG":
+                return [float(s / c) for s, c in zip(sums, counts)]
+            return [_python(s, col) for s in sums]
+        if values.dtype.kind == "f":
+            out = np.full(n, np.inf if func == "MIN" else -np.inf)
+        else:
+            info = np.iinfo(values.dtype)
+            out = np.full(n, info.max if func == "MIN" else info.min, dtype=values.dtype)
+        (np.minimum if func == "MIN" else np.maximum).at(out, gid, values)
+        return [_python(v, col) for v in out]
+
+    def execute(self, sql: str):
+        """Return (column names, rows) for a supported query, else None."""
+        parsed = parse(sql)
+        if parsed is None:
+            return None
+        items, conditions, groups = parsed
+        if any(kind == "col" and item[0] not in groups for (kind, *item), _ in items):
+            return None
+        try:
+            mask = self._mask(conditions)
+            select = (lambda a: a) if mask is None else (lambda a: a[mask])
+            if groups:
+                gid, counts, keys = self._groups(groups, select)
+            else:
+                gid = None
+                counts = [self.rows if mask is None else int(np.count_nonzero(mask))]
+        except _Unsupported:
+            return None
+
+        columns = []
+        for (kind, *item), _ in items:
+            if kind == "col":
+                level = keys[groups.index(item[0])]
+                if item[0] in CATEGORICAL:
+                    columns.append([self.dictionaries[item[0]][c] for c in level])
+                else:
+                    columns.append([_python(v, item[0]) for v in level])
+                continue
+            func, col, digits = item
+            values = self._aggregate(func, col, select, gid, counts)
+            if digits is not None:
+                try:
+                    values = [None if v is None else _sql_round(v, int(digits), func in ("MIN", "MAX"))
+                              for v in values]
+                except _Unsupported:
+                    return None
+            columns.append(values)
+
+        names = [name for _, name in items]
+        return names, [tuple(row) for row in zip(*columns)]
+
+_engine = None
+_lock = threading.Lock()
+
+def get_engine(conn, version: str | None) -> ColumnarEngine:
+    """Return the process-wide engine, reloading it when the data version changes."""
+    global _engine
+    with _lock:
+        if _engine is None or _engine.version != version or version is None:
+            _engine = ColumnarEngine.from_sqlite(conn, version)
+            metrics.incr("columnar.load")
+        return _engine
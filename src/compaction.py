@@ -0,0 +1,136 @@
+"""Bound the history replayed into each model call to a token budget.
+
+The checkpoint keeps the full thread; only the model's view is compacted. The
+latest turns are sent verbatim. Older turns are shrunk in steps until the
+prompt fits: long tool outputs are truncated, then tool exchanges are dropped
+leaving each question and its answer, then the oldest turns are dropped.
+Short query_customers/get_stats results from compacted turns are pinned in
+the system prompt, so numbers computed earlier stay available.
+"""
+import logging
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+PINNED_TOOLS = ("query_customers", "get_stats")
+
+def count_tokens(messages: list) -> int:
+    """Approximate prompt tokens (about 4 characters each), without a tokenizer download."""
+    return count_tokens_approximately(messages)
+
+def split_turns(messages: list) -> list:
+    """Group messages into turns, each starting at a HumanMessage."""
+    turns = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+def _truncate(turn: list, max_chars: int) -> list:
+    out = []
+    for msg in turn:
+        if isinstance(msg, ToolMessage) and len(msg.content) > max_chars:
+            dropped = len(msg.content) - max_chars
+            msg = msg.model_copy(update={"content": f"{msg.content[:max_chars]}\n… [{dropped} chars truncated]"})
+        out.append(msg)
+    return out
+
+def _collapse(turn: list) -> list:
+    """The question and final answer of a turn, without its tool calls and results."""
+    kept = [m for m in turn if isinstance(m, HumanMessage)]
+    answers = [m for m in turn if isinstance(m, AIMessage) and not m.tool_calls and m.content]
+    return kept + answers[-1:]
+
+def pinned_facts(turns: list, max_chars: int) -> list:
+    """One line per short query_customers/get_stats result, e.g. the SQL and its numbers."""
+    facts = []
+    for turn in turns:
+        calls = {c["id"]: c for m in turn if isinstance(m, AIMessage) for c in m.tool_calls}
+        for msg in turn:
+            if not isinstance(msg, ToolMessage) or msg.name not in PINNED_TOOLS:
+                continue
+            if len(msg.content) > max_chars or msg.status == "error":
+                continue
+            args = calls.get(msg.tool_call_id, {}).get("args", {})
+            label = f"{msg.name}({args['sql']})" if "sql" in args else msg.name
+            fact = f"{label} → {'; '.join(line for line in msg.content.splitlines() if line.strip())}"
+            if fact not in facts:
+                facts.append(fact)
+    return facts
+
+def compact(messages: list, budget: int, keep_turns: int = 2, tool_chars: int = 300,
+            pin_chars: int = 600, max_facts: int = 20) -> tuple:
+    """Return (messages, facts) fitting roughly within budget tokens.
+
+    The last keep_turns turns are never changed, so a single huge turn can
+    still exceed the budget.
+    """
+    if budget <= 0 or count_tokens(messages) <= budget:
+        return messages, []
+    turns = split_turns(messages)
+    split = max(len(turns) - keep_turns, 0)
+    older, recent = turns[:split], turns[split:]
+    if not older:
+        return messages, []
+    facts = pinned_facts(older, pin_chars)[-max_facts:]
+    available = budget - sum(count_tokens(turn) for turn in recent)
+    if facts:
+        available -= count_tokens([SystemMessage("\n".join(facts))])
+    recent_msgs = [m for turn in recent for m in turn]
+
+    truncated = [_truncate(turn, tool_chars) for turn in older]
+    if sum(count_tokens(turn) for turn in truncated) <= available:
+        return [m for turn in truncated for m in turn] + recent_msgs, facts
+    collapsed = [_collapse(turn) for turn in truncated]
+    sizes = [count_tokens(turn) for turn in collapsed]
+    total, first = sum(sizes), 0
+    while first < len(collapsed) and total > available:
+        total -= sizes[first]
+        first += 1
+    return [m for turn in collapsed[first:] for m in turn] + recent_msgs, facts
+
+class HistoryCompactionMiddleware(AgentMiddleware):
+    """Compacts each model request's history to ``budget`` tokens (0 disables).
+
+    Records history.raw_tokens and history.input_tokens (estimated prompt
+    size before and after).
+    """
+
+    def __init__(self, budget: int, keep_turns: int = 2, tool_chars: int = 300, pin_chars: int = 600):
+        super().__init__()
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.tool_chars = tool_chars
+        self.pin_chars = pin_chars
+
+    def _compact(self, request: ModelRequest) -> ModelRequest:
+        system = [request.system_message] if request.system_message else []
+        raw = count_tokens(system + request.messages)
+        system_tokens = count_tokens(system) if system else 0
+        messages, facts = compact(request.messages, self.budget - system_tokens,
+                                  self.keep_turns, self.tool_chars, self.pin_chars)
+        if messages is not request.messages:
+            metrics.incr("history.compacted")
+            updates = {"messages": messages}
+            if facts:
+                text = (request.system_prompt or "") + "\n\nFacts established earlier in this conversation:\n"
+                updates["system_message"] = SystemMessage(text + "\n".join(f"- {f}" for f in facts))
+            request = request.override(**updates)
+            system = [request.system_message] if request.system_message else []
+        tokens = count_tokens(system + request.messages)
+        metrics.observe("history.raw_tokens", raw)
+        metrics.observe("history.input_tokens", tokens)
+        logger.debug("Model input: %d tokens (%d before compaction)", tokens, raw)
+        return request
+
+    def wrap_model_call(self, request, handler):
+        return handler(self._compact(request))
+
+    async def awrap_model_call(self, request, handler):
+        return await handler(self._compact(request))
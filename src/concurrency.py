@@ -0,0 +1,81 @@
+"""Request admission control and the executor that runs blocking tool work."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+
+from src import metrics
+from src.config import get_settings
+
+_executor = None
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared pool for SQLite/FAISS/embedding calls made from async code."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().tool_executor_workers, thread_name_prefix="tool"
+        )
+    return _executor
+
+async def run_blocking(func, *args, **kwargs):
+    """Run func on the tool executor without blocking the event loop."""
+    call = partial(copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), call)
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted: the queue is full or the wait timed out."""
+
+class ConcurrencyLimiter:
+    """Async context manager capping in-flight requests, with a bounded wait queue.
+
+    Requests beyond ``max_concurrent`` wait for a slot; once ``max_queue`` are
+    already waiting, or a wait exceeds ``queue_timeout_s``, Overloaded is raised
+    so the caller can shed load instead of piling up latency.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout_s: float):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_s = queue_timeout_s
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = None
+        self._loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+
+    @property
+    def saturated(self) -> bool:
+        return self.active >= self.max_concurrent
+
+    async def __aenter__(self):
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.waiting >= self.max_queue:
+                metrics.incr("concurrency.rejected")
+                raise Overloaded(f"server busy: {self.waiting} requests already queued")
+            self.waiting += 1
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(semaphore.acquire(), self.queue_timeout_s)
+            except asyncio.TimeoutError:
+                metrics.incr("concurrency.rejected")
+                raise Overloaded(f"server busy: no slot within {self.queue_timeout_s}s") from None
+            finally:
+                self.waiting -= 1
+            metrics.observe("concurrency.queue_wait_seconds", time.perf_counter() - start)
+        else:
+            await semaphore.acquire()
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.active -= 1
+        self._semaphore.release()
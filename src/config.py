@@ -7,8 +7,68 @@ class Settings(BaseSettings):
     hf_token: str = ""
     aws_region: str = "ap-south-1"
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_cache_dtype: str = "float16"
+    faiss_mmap: bool = True
+    faiss_index_type: str = "flat"  # flat, ivf, hnsw, pq, sq, or a FAISS index_factory string
+    faiss_nlist: int = 0  # IVF lists; 0 picks about 4*sqrt(corpus size)
+    faiss_nprobe: int = 8  # IVF lists searched per query
+    faiss_hnsw_m: int = 32
+    faiss_ef_search: int = 64  # HNSW candidates per query
+    faiss_pq_m: int = 48  # PQ bytes per vector; must divide the embedding dimension (8 dims each for 384)
+    faiss_train_sample: int = 50_000  # vectors sampled to train IVF/PQ
+    workers: int = 1
+    query_embedding_cache_size: int = 2048
+    query_embedding_warm_path: str = ""  # .npz file to load at startup and save at exit
+    faq_chunk_chars: int = 1000  # longer FAQ answers are indexed as several documents
+    embed_workers: int = 0  # index build: embedding processes, one model each; 0 embeds in-process
+    embed_batch_size: int = 64
+    embed_threads_per_worker: int = 0  # torch threads per embedding process; 0 splits the CPUs evenly
+    faq_retrieval: str = "hybrid"  # "hybrid" (BM25 + vector, fused) or "vector"
+    faq_candidates: int = 10
+    faq_rrf_k: int = 60
+    faq_lexical_margin: float = 1.2
+    max_concurrent_requests: int = 64
+    max_queued_requests: int = 256
+    queue_timeout_s: float = 30.0
+    tool_executor_workers: int = 8
+    checkpointer: str = "bounded"  # "bounded" (latest checkpoint per thread, evicting) or "memory"
+    checkpoint_max_threads: int = 10_000
+    checkpoint_max_mb: int = 256
+    checkpoint_ttl_s: float = 0  # 0 keeps idle threads until the thread or memory cap evicts them
+    checkpoint_spill_path: str = ""  # SQLite file evicted threads are saved to and resumed from
+    batch_concurrency: int = 8
+    batch_rate_limit: float = 0  # requests/second across all batch threads; 0 is unlimited
+    metrics_enabled: bool = True
+    slow_request_s: float = 5.0  # log a per-stage breakdown for requests slower than this
+    history_token_budget: int = 6000  # 0 replays the whole thread into every model call
+    history_keep_turns: int = 2
+    history_tool_chars: int = 300
+    memory_batch_size: int = 32
+    memory_flush_interval_s: float = 1.0
+    memory_max_retries: int = 5
+    router_enabled: bool = True
+    router_threshold: float = 0.6
+    answer_cache_size: int = 512  # 0 disables the semantic answer cache
+    answer_cache_ttl_s: float = 3600.0
+    answer_cache_threshold: float = 0.92
     llm_model: str = "openai/gpt-oss-120b"
     data_dir: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+    ingest_batch_size: int = 5000
+    ingest_cache_kb: int = 65536
+    db_pool_size: int = 8
+    db_pool_timeout_s: float = 10.0
+    db_mmap_size: int = 268435456
+    db_shared_cache: bool = True
+    query_cache_size: int = 256
+    query_cache_ttl_s: float = 600.0
+    query_preview_rows: int = 15
+    query_max_output_bytes: int = 4000
+    query_count_limit: int = 1_000_000
+    query_timeout_s: float = 5.0
+    query_max_vm_steps: int = 500_000_000
+    query_large_table_rows: int = 100_000
+    query_max_scan_rows: int = 10_000_000
+    query_engine: str = "sqlite"  # "sqlite" or "columnar"
     
     class Config:
         env_file = ".env"
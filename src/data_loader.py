@@ -1,55 +1,98 @@
 import csv
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import shutil
 import sqlite3
+import threading
+import time
+from itertools import islice
 from pathlib import Path
 from langchain_core.documents import Document
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+from src import metrics
 from src.config import get_settings
+from src.db_pool import ConnectionPool
+from src.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.lexical import BM25Index
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 DATA_DIR = Path(settings.data_dir)
 DB_PATH = DATA_DIR / "telecom.db"
 
-def init_sqlite_db():
-    """Initialize SQLite with cleaned customer data."""
-    if DB_PATH.exists():
-        DB_PATH.unlink()
-    
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
-    cur.execute("""
-        CREATE TABLE customers (
-            customer_id TEXT PRIMARY KEY,
-            gender TEXT,
-            senior_citizen INTEGER,
-            partner TEXT,
-            dependents TEXT,
-            tenure INTEGER,
-            phone_service TEXT,
-            multiple_lines TEXT,
-            internet_service TEXT,
-            online_security TEXT,
-            online_backup TEXT,
-            device_protection TEXT,
-            tech_support TEXT,
-            streaming_tv TEXT,
-            streaming_movies TEXT,
-            contract TEXT,
-            paperless_billing TEXT,
-            payment_method TEXT,
-            monthly_charges REAL,
-            total_charges REAL,
-            churn TEXT
-        )
-    """)
-    
-    with open(DATA_DIR / "customers.csv", "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            cur.execute("""
-                INSERT INTO customers VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """, (
+CUSTOMER_COLUMNS = (
+    "customer_id", "gender", "senior_citizen", "partner", "dependents", "tenure",
+    "phone_service", "multiple_lines", "internet_service", "online_security",
+    "online_backup", "device_protection", "tech_support", "streaming_tv",
+    "streaming_movies", "contract", "paperless_billing", "payment_method",
+    "monthly_charges", "total_charges", "churn",
+)
+
+CUSTOMERS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS customers (
+        customer_id TEXT PRIMARY KEY,
+        gender TEXT,
+        senior_citizen INTEGER,
+        partner TEXT,
+        dependents TEXT,
+        tenure INTEGER,
+        phone_service TEXT,
+        multiple_lines TEXT,
+        internet_service TEXT,
+        online_security TEXT,
+        online_backup TEXT,
+        device_protection TEXT,
+        tech_support TEXT,
+        streaming_tv TEXT,
+        streaming_movies TEXT,
+        contract TEXT,
+        paperless_billing TEXT,
+        payment_method TEXT,
+        monthly_charges REAL,
+        total_charges REAL,
+        churn TEXT
+    )
+"""
+
+# Chosen from the filters and group-bys the agent generates; the trailing
+# columns make the common aggregates (churn counts, charge averages) covering.
+CUSTOMER_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_customers_churn ON customers (churn, monthly_charges)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_contract ON customers (contract, churn, monthly_charges)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_internet ON customers (internet_service, churn, monthly_charges)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_payment ON customers (payment_method, churn)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_tenure ON customers (tenure, churn)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_charges ON customers (monthly_charges, churn)",
+)
+
+_PLACEHOLDERS = ",".join("?" * len(CUSTOMER_COLUMNS))
+_UPSERT_SQL = (
+    "INSERT INTO customers SELECT * FROM customers_staging WHERE true "
+    "ON CONFLICT(customer_id) DO UPDATE SET "
+    + ", ".join(f"{c}=excluded.{c}" for c in CUSTOMER_COLUMNS[1:])
+    + " WHERE "
+    + " OR ".join(f"customers.{c} IS NOT excluded.{c}" for c in CUSTOMER_COLUMNS[1:])
+)
+
+META_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS stats_snapshot (data_version TEXT PRIMARY KEY, payload TEXT)",
+)
+
+def _hashed_lines(f, digest):
+    for line in f:
+        digest.update(line.encode())
+        yield line
+
+def _iter_customer_rows(csv_path: Path, digest=None):
+    """Stream cleaned customer tuples from the CSV extract, hashing it into digest."""
+    with open(csv_path, "r", newline="") as f:
+        lines = _hashed_lines(f, digest) if digest is not None else f
+        for row in csv.DictReader(lines):
+            yield (
                 row["customerID"], row["gender"], int(row["SeniorCitizen"]),
                 row["Partner"], row["Dependents"], int(row["tenure"]),
                 row["PhoneService"], row["MultipleLines"], row["InternetService"],
@@ -57,45 +100,461 @@ def init_sqlite_db():
                 row["TechSupport"], row["StreamingTV"], row["StreamingMovies"],
                 row["Contract"], row["PaperlessBilling"], row["PaymentMethod"],
                 float(row["MonthlyCharges"]), float(row["TotalCharges"]), row["Churn"]
-            ))
-    conn.commit()
-    conn.close()
+            )
+
+def _load_batches(conn: sqlite3.Connection, table: str, rows) -> int:
+    """Insert rows into table in executemany batches; returns rows written."""
+    sql = f"INSERT INTO {table} VALUES ({_PLACEHOLDERS})"
+    total = 0
+    while True:
+        batch = list(islice(rows, settings.ingest_batch_size))
+        if not batch:
+            return total
+        conn.executemany(sql, batch)
+        total += len(batch)
+
+def _apply_ingest_pragmas(conn: sqlite3.Connection, durable: bool):
+    """Tune SQLite for bulk loading; durable keeps a rollback journal for live files."""
+    conn.execute(f"PRAGMA journal_mode={'DELETE' if durable else 'OFF'}")
+    conn.execute(f"PRAGMA synchronous={'NORMAL' if durable else 'OFF'}")
+    conn.execute(f"PRAGMA cache_size=-{settings.ingest_cache_kb}")
+
+def compute_stats_snapshot(conn: sqlite3.Connection) -> dict:
+    """Aggregate the overview statistics and common breakdowns in one table scan."""
+    groups = conn.execute("""
+        SELECT contract, internet_service, churn, COUNT(*),
+               SUM(monthly_charges), MIN(monthly_charges), MAX(monthly_charges)
+        FROM customers GROUP BY contract, internet_service, churn
+    """).fetchall()
+
+    total, charges, low, high = 0, 0.0, None, None
+    contracts, internet, churn = {}, {}, {}
+    churn_by_contract, charges_by_internet = {}, {}
+    for contract, service, churned, n, s, lo, hi in groups:
+        total += n
+        charges += s
+        low = lo if low is None else min(low, lo)
+        high = hi if high is None else max(high, hi)
+        contracts[contract] = contracts.get(contract, 0) + n
+        internet[service] = internet.get(service, 0) + n
+        churn[churned] = churn.get(churned, 0) + n
+        by_churn = churn_by_contract.setdefault(contract, {})
+        by_churn[churned] = by_churn.get(churned, 0) + n
+        count_sum = charges_by_internet.setdefault(service, [0, 0.0])
+        count_sum[0] += n
+        count_sum[1] += s
+
+    return {
+        "total": total,
+        "monthly_charges": {
+            "avg": round(charges / total, 2) if total else None,
+            "min": low,
+            "max": high,
+        },
+        "contracts": dict(sorted(contracts.items())),
+        "internet": dict(sorted(internet.items())),
+        "churn": dict(sorted(churn.items())),
+        "churn_by_contract": {k: dict(sorted(v.items())) for k, v in sorted(churn_by_contract.items())},
+        "avg_charges_by_internet": {
+            k: round(s / n, 2) for k, (n, s) in sorted(charges_by_internet.items())
+        },
+    }
+
+def _write_snapshot(conn: sqlite3.Connection, data_version: str):
+    """Record the data version and its statistics snapshot (inside the load transaction)."""
+    for statement in META_SCHEMA:
+        conn.execute(statement)
+    conn.execute("DELETE FROM stats_snapshot")
+    conn.execute(
+        "INSERT INTO stats_snapshot VALUES (?, ?)",
+        (data_version, json.dumps(compute_stats_snapshot(conn))),
+    )
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('data_version', ?)", (data_version,))
+
+def get_data_version(conn: sqlite3.Connection) -> str | None:
+    """Return the data version stamp written by init_sqlite_db, if any."""
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key='data_version'").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+def _rebuild(csv_path: Path, db_path: Path) -> dict:
+    """Stream the extract into a fresh file and atomically swap it into place."""
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        _apply_ingest_pragmas(conn, durable=False)
+        conn.execute("BEGIN")
+        conn.execute(CUSTOMERS_SCHEMA)
+        digest = hashlib.sha1()
+        rows = _load_batches(conn, "customers", _iter_customer_rows(csv_path, digest))
+        # Indexes are cheaper to build once over the loaded table than to maintain per row.
+        for statement in CUSTOMER_INDEXES:
+            conn.execute(statement)
+        conn.execute("ANALYZE")
+        data_version = digest.hexdigest()
+        _write_snapshot(conn, data_version)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, db_path)
+    return {"mode": "full", "rows": rows, "upserted": rows, "deleted": 0,
+            "data_version": data_version}
+
+def _upsert(csv_path: Path, db_path: Path) -> dict:
+    """Upsert changed customers and drop the ones missing from the extract."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        _apply_ingest_pragmas(conn, durable=True)
+        conn.execute("CREATE TEMP TABLE customers_staging AS SELECT * FROM customers WHERE 0")
+        conn.execute("BEGIN")
+        digest = hashlib.sha1()
+        rows = _load_batches(conn, "customers_staging", _iter_customer_rows(csv_path, digest))
+        before = conn.total_changes
+        conn.execute(_UPSERT_SQL)
+        upserted = conn.total_changes - before
+        deleted = conn.execute(
+            "DELETE FROM customers WHERE customer_id NOT IN "
+            "(SELECT customer_id FROM customers_staging)"
+        ).rowcount
+        # Unchanged data keeps its version so snapshots and caches stay valid.
+        data_version = get_data_version(conn)
+        if upserted or deleted or data_version is None:
+            data_version = digest.hexdigest()
+            _write_snapshot(conn, data_version)
+        for statement in CUSTOMER_INDEXES:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    return {"mode": "incremental", "rows": rows, "upserted": upserted, "deleted": deleted,
+            "data_version": data_version}
+
+def init_sqlite_db(incremental: bool = False, csv_path: Path | None = None,
+                   db_path: Path | None = None) -> dict:
+    """Initialize SQLite with cleaned customer data and return ingestion stats.
+
+    The default rebuilds the database from scratch; incremental mode upserts only
+    changed customer_ids into an existing database.
+    """
+    csv_path = Path(csv_path or DATA_DIR / "customers.csv")
+    db_path = Path(db_path or DB_PATH)
+
+    start = time.perf_counter()
+    with metrics.span("build.sqlite"):
+        if incremental and db_path.exists():
+            stats = _upsert(csv_path, db_path)
+        else:
+            stats = _rebuild(csv_path, db_path)
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+
+    if _pool is not None and db_path.resolve() == _pool.db_path.resolve():
+        _pool.reset()
+    return stats
+
+INDEX_PATH = DATA_DIR / "faiss_index"
+MANIFEST = "manifest.json"
+LEXICAL_INDEX = "bm25.json"
+
+def chunk_text(text: str, max_chars: int) -> list:
+    """Split text into pieces of at most max_chars, at sentence ends where possible."""
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+    chunks, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        while len(sentence) > max_chars:  # a single overlong sentence: cut at a space
+            cut = sentence.rfind(" ", 1, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def iter_faq_docs(csv_path: Path | None = None, chunk_chars: int | None = None):
+    """Yield FAQ documents lazily, each with a content-hash id.
+
+    Answers longer than chunk_chars (settings.faq_chunk_chars) become several
+    documents, each repeating the question.
+    """
+    chunk_chars = settings.faq_chunk_chars if chunk_chars is None else chunk_chars
+    with open(csv_path or DATA_DIR / "qna.csv", "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            question = row["question"].strip()
+            chunks = chunk_text(row["answer"].strip(), chunk_chars)
+            for i, answer in enumerate(chunks):
+                content = f"Q: {question}\nA: {answer}"
+                metadata = {"source": "faq", "chunk": i} if len(chunks) > 1 else {"source": "faq"}
+                yield Document(id=hashlib.sha1(content.encode()).hexdigest(), page_content=content,
+                               metadata=metadata)
 
 def load_faq_docs():
-    """Load FAQ as documents."""
-    docs = []
-    with open(DATA_DIR / "qna.csv", "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            docs.append(Document(
-                page_content=f"Q: {row['question'].strip()}\nA: {row['answer'].strip()}",
-                metadata={"source": "faq"}
-            ))
-    return docs
-
-def build_vector_store():
-    """Build FAISS index from FAQ."""
-    index_path = DATA_DIR / "faiss_index"
-    if index_path.exists():
-        import shutil
-        shutil.rmtree(index_path)
-    
-    docs = load_faq_docs()
-    emb = HuggingFaceEmbeddings(model_name=settings.embedding_model)
-    store = FAISS.from_documents(docs, emb)
-    store.save_local(str(index_path))
-    return store
+    """Load FAQ as documents, each with a content-hash id."""
+    return list(iter_faq_docs())
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings():
+    """The process-wide embedding model, backed by the on-disk embedding cache.
+
+    Loaded once and shared by index builds, FAQ search and the answer cache;
+    a pre-fork server loads it before forking so workers share the weights.
+    """
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            from langchain_huggingface import HuggingFaceEmbeddings
+            cache = EmbeddingCache(
+                DATA_DIR / "embedding_cache", settings.embedding_model, settings.embedding_cache_dtype
+            )
+            _embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name=settings.embedding_model), cache)
+    return _embeddings
+
+def _read_manifest(index_path: Path) -> dict:
+    path = index_path / MANIFEST
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def _index_dir(index_path: Path) -> Path:
+    """The build directory index_path currently points at; read all files of one load from it."""
+    return index_path.resolve()
+
+def _save_index(store, docs: dict, index_path: Path, factory: str = "Flat"):
+    """Write a new build directory, then point index_path at it with one atomic symlink swap.
+
+    index_path is a symlink to a sibling ``<name>.<stamp>`` directory. A reader
+    that resolves it once (_index_dir) gets index.faiss, index.pkl, bm25.json
+    and manifest.json from the same build, and memory-mapped files stay valid
+    after they are replaced. The previous build is kept for readers still
+    loading it; older ones are removed.
+    """
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    build_dir = index_path.with_name(f"{index_path.name}.{time.time_ns()}")
+    store.save_local(str(build_dir))
+    BM25Index.from_documents(docs.values()).save(build_dir / LEXICAL_INDEX)
+    (build_dir / MANIFEST).write_text(json.dumps({
+        "model": settings.embedding_model,
+        "version": hashlib.sha1("".join(sorted(docs)).encode()).hexdigest(),
+        "index_type": settings.faiss_index_type,
+        "factory": factory,
+    }))
+    if index_path.is_symlink():
+        previous = index_path.resolve().name
+    elif index_path.exists():
+        # A plain directory from an older build: move it aside so the link can take its place.
+        previous = f"{index_path.name}.0"
+        index_path.rename(index_path.with_name(previous))
+    else:
+        previous = None
+    link = index_path.with_name(index_path.name + ".link")
+    if link.is_symlink():
+        link.unlink()
+    link.symlink_to(build_dir.name, target_is_directory=True)
+    os.replace(link, index_path)
+    for old in index_path.parent.glob(f"{index_path.name}.*"):
+        if old.name not in (build_dir.name, previous) and old.is_dir() and not old.is_symlink():
+            shutil.rmtree(old, ignore_errors=True)
+
+# settings.faiss_index_type -> FAISS index_factory description; other values are passed through as is.
+FAISS_INDEX_TYPES = {
+    "flat": "Flat",              # exact search
+    "ivf": "IVF{nlist},Flat",    # clustered, searches nprobe lists
+    "hnsw": "HNSW{hnsw_m}",      # graph; no deletes, so FAQ edits rebuild it
+    "pq": "IVF{nlist},PQ{pq_m}", # clustered, pq_m bytes per vector
+    "sq": "SQ8",                 # exact scan over 1-byte components
+}
+
+def faiss_factory_string(count: int, index_type: str = None) -> str:
+    """index_factory description for a corpus of count vectors.
+
+    nlist defaults to about 4*sqrt(count), capped so each list gets at least
+    39 training points (FAISS's own minimum).
+    """
+    index_type = index_type or settings.faiss_index_type
+    trained_on = min(count, settings.faiss_train_sample)
+    nlist = settings.faiss_nlist or max(1, min(int(4 * count ** 0.5), trained_on // 39))
+    return FAISS_INDEX_TYPES.get(index_type, index_type).format(
+        nlist=nlist, hnsw_m=settings.faiss_hnsw_m, pq_m=settings.faiss_pq_m
+    )
+
+def set_search_params(index, nprobe: int = None, ef_search: int = None):
+    """Apply search-time knobs (IVF nprobe, HNSW efSearch); they are not stored in the index file."""
+    import faiss
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or settings.faiss_nprobe, ivf.nlist)
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search or settings.faiss_ef_search
+    return index
+
+def new_faiss_index(vectors, factory: str, train_sample: int = None):
+    """Empty index for factory, trained on a random sample of vectors if it needs training.
+
+    Falls back to a flat index when the corpus is too small to train it
+    (e.g. PQ needs 256 points per codebook). Returns (index, factory used).
+    """
+    import faiss
+    import numpy as np
+    vectors = np.asarray(vectors, dtype="float32")
+    index = faiss.index_factory(vectors.shape[1], factory)
+    if not index.is_trained:
+        sample_size = min(train_sample or settings.faiss_train_sample, len(vectors))
+        sample = vectors[np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)]
+        try:
+            with metrics.span("build.train"):
+                index.train(sample)
+        except RuntimeError as e:
+            logger.warning("Cannot train %s on %d vectors (%s); using a flat index", factory, sample_size, e)
+            return faiss.index_factory(vectors.shape[1], "Flat"), "Flat"
+    return set_search_params(index), factory
+
+def build_vector_store(rebuild: bool = False):
+    """Build FAISS index from FAQ, embedding only new or edited Q&A pairs.
+
+    An existing index built with the same model and index type is updated in
+    place: removed pairs are deleted and new ones appended (trained indexes
+    keep their centroids). Otherwise, or with ``rebuild=True``, the index is
+    built afresh by the streaming pipeline in src.ingest (still reusing cached
+    embeddings). The index type comes from settings.faiss_index_type and is
+    recorded in the manifest.
+
+    Returns (store, report); the report has documents, embedded and seconds,
+    plus build_store's throughput and peak memory after a full build.
+    """
+    from langchain_community.vectorstores import FAISS
+    emb = get_embeddings()
+    start = time.perf_counter()
+
+    index_path = _index_dir(INDEX_PATH)
+    manifest = _read_manifest(index_path)
+    factory = manifest.get("factory", "Flat")
+    reusable = manifest.get("model") == settings.embedding_model and (
+        manifest.get("index_type", "flat") == settings.faiss_index_type
+    )
+    store = None
+    if not rebuild and reusable:
+        docs = {doc.id: doc for doc in iter_faq_docs()}
+        if not docs:
+            raise ValueError("no FAQ documents to index")
+        store = FAISS.load_local(str(index_path), emb, allow_dangerous_deserialization=True)
+        set_search_params(store.index)
+        existing = set(store.index_to_docstore_id.values())
+        stale = [doc_id for doc_id in existing if doc_id not in docs]
+        new = [doc for doc_id, doc in docs.items() if doc_id not in existing]
+        try:
+            if stale:
+                store.delete(stale)
+        except RuntimeError:
+            store = None  # the index type can't remove vectors (HNSW)
+        if store is not None and new:
+            texts = [doc.page_content for doc in new]
+            with metrics.span("build.embed"):
+                vectors = emb.embed_documents(texts)
+            with metrics.span("build.faiss"):
+                store.add_embeddings(
+                    zip(texts, vectors),
+                    metadatas=[doc.metadata for doc in new],
+                    ids=[doc.id for doc in new],
+                )
+        report = {"documents": len(docs), "embedded": len(new), "removed": len(stale)}
+        if store is not None and not stale and not new and (index_path / LEXICAL_INDEX).exists():
+            return store, {**report, "seconds": time.perf_counter() - start}
+    if store is None:
+        from src.ingest import build_store
+        docs = {}
+        def unique_docs():
+            for doc in iter_faq_docs():
+                if doc.id not in docs:
+                    docs[doc.id] = doc
+                    yield doc
+        store, factory, report = build_store(unique_docs(), emb, emb.cache)
+
+    with metrics.span("build.save"):
+        _save_index(store, docs, INDEX_PATH, factory)
+    return store, {**report, "seconds": time.perf_counter() - start}
+
+def read_faiss_index(path: Path):
+    """Read a FAISS index file, memory-mapped read-only when settings.faiss_mmap is on.
+
+    Mapped vectors live in the page cache, so every process serving the same
+    file shares one copy instead of holding it on its own heap.
+    """
+    import faiss
+    flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+    if settings.faiss_mmap and flag is not None:
+        return set_search_params(faiss.read_index(str(path), flag | faiss.IO_FLAG_READ_ONLY))
+    return set_search_params(faiss.read_index(str(path)))
 
 def load_vector_store():
-    """Load FAISS index."""
-    index_path = DATA_DIR / "faiss_index"
-    emb = HuggingFaceEmbeddings(model_name=settings.embedding_model)
-    if index_path.exists():
-        return FAISS.load_local(str(index_path), emb, allow_dangerous_deserialization=True)
-    return build_vector_store()
+    """Load FAISS index (read-only, memory-mapped) for search."""
+    from langchain_community.vectorstores import FAISS
+    if not INDEX_PATH.exists():
+        return build_vector_store()[0]
+    index_path = _index_dir(INDEX_PATH)
+    with open(index_path / "index.pkl", "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(get_embeddings(), read_faiss_index(index_path / "index.faiss"), docstore, index_to_docstore_id)
+
+def get_knowledge_version() -> str:
+    """Version of everything an answer can depend on: customer data and FAQ index."""
+    with get_db_pool().connection() as conn:
+        db_version = get_data_version(conn)
+    return f"{db_version}:{_read_manifest(INDEX_PATH).get('version')}"
+
+def load_lexical_index():
+    """Load the BM25 index saved next to the FAISS index, or build it from the FAQ."""
+    path = _index_dir(INDEX_PATH) / LEXICAL_INDEX
+    if path.exists():
+        return BM25Index.load(path)
+    return BM25Index.from_documents(load_faq_docs())
 
 def get_db_connection():
     """Get SQLite connection."""
     if not DB_PATH.exists():
         init_sqlite_db()
     return sqlite3.connect(DB_PATH)
+
+def load_stats_snapshot(conn: sqlite3.Connection):
+    """Return (data_version, snapshot) for the loaded data, or None if not materialized."""
+    try:
+        row = conn.execute("""
+            SELECT s.data_version, s.payload FROM meta m
+            JOIN stats_snapshot s ON s.data_version = m.value
+            WHERE m.key = 'data_version'
+        """).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return (row[0], json.loads(row[1])) if row else None
+
+_pool = None
+
+def get_db_pool() -> ConnectionPool:
+    """Get the shared read-only connection pool used by the tools."""
+    global _pool
+    if _pool is None:
+        if not DB_PATH.exists():
+            init_sqlite_db()
+        _pool = ConnectionPool(
+            DB_PATH,
+            size=settings.db_pool_size,
+            mmap_size=settings.db_mmap_size,
+            shared_cache=settings.db_shared_cache,
+            timeout_s=settings.db_pool_timeout_s,
+        )
+    return _pool
@@ -0,0 +1,161 @@
+"""Bounded pool of read-only SQLite connections."""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from src import metrics
+
+class ConnectionPool:
+    """Thread-safe pool of read-only connections to one SQLite file.
+
+    Connections are opened lazily up to ``size`` and reused LIFO so the warmest
+    page cache is handed out first. The file identity is re-checked at most every
+    ``recheck_s`` seconds; when the database is rebuilt and swapped into place,
+    idle connections are closed and checked-out ones are dropped on return.
+    """
+
+    def __init__(self, db_path: Path, size: int = 4, mmap_size: int = 0,
+                 shared_cache: bool = True, timeout_s: float = 10.0, recheck_s: float = 1.0):
+        self.db_path = Path(db_path)
+        self.size = size
+        self.mmap_size = mmap_size
+        self.shared_cache = shared_cache
+        self.timeout_s = timeout_s
+        self.recheck_s = recheck_s
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._generation = 0
+        self._stale_out = 0
+        self._file_id = self._stat()
+        self._checked_at = time.monotonic()
+        self._stats = metrics.Recorder("db_pool")
+
+    def _stat(self):
+        st = os.stat(self.db_path)
+        return st.st_dev, st.st_ino
+
+    def _connect(self, shared: bool) -> sqlite3.Connection:
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        if shared:
+            uri += "&cache=shared"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA query_only=ON")
+        if self.mmap_size:
+            conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        return conn
+
+    def _maybe_recheck(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.recheck_s:
+            return
+        self._checked_at = now
+        try:
+            file_id = self._stat()
+        except FileNotFoundError:
+            return
+        if file_id != self._file_id:
+            self._file_id = file_id
+            self.reset()
+
+    def _try_create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+            gen = self._generation
+            # A connection joining a shared cache that stale connections still
+            # hold would see the replaced file, so stay private until they drain.
+            shared = self.shared_cache and self._stale_out == 0
+        self._stats.incr("miss")
+        try:
+            return self._connect(shared), gen
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _acquire(self):
+        self._maybe_recheck()
+        try:
+            item = self._idle.get_nowait()
+            self._stats.incr("hit")
+            return item
+        except queue.Empty:
+            pass
+
+        item = self._try_create()
+        if item is not None:
+            return item
+
+        self._stats.incr("wait")
+        start = time.perf_counter()
+        deadline = start + self.timeout_s
+        try:
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a database connection")
+                try:
+                    return self._idle.get(timeout=min(remaining, 0.05))
+                except queue.Empty:
+                    # Retired connections free capacity without touching the queue.
+                    item = self._try_create()
+                    if item is not None:
+                        return item
+        finally:
+            self._stats.observe("wait_seconds", time.perf_counter() - start)
+
+    def _release(self, conn: sqlite3.Connection, gen: int):
+        with self._lock:
+            current = gen == self._generation
+            if current:
+                self._idle.put((conn, gen))
+            else:
+                self._created -= 1
+                self._stale_out -= 1
+        if not current:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the block."""
+        conn, gen = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn, gen)
+
+    def reset(self):
+        """Close idle connections and retire checked-out ones (e.g. after a rebuild)."""
+        with self._lock:
+            self._generation += 1
+            closed = 0
+            while True:
+                try:
+                    conn, _ = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                closed += 1
+            self._created -= closed
+            self._stale_out = self._created
+        self._stats.incr("reset")
+
+    def stats(self) -> dict:
+        """Occupancy and hit/miss/wait counts of this pool."""
+        return {
+            "size": self.size,
+            "open": self._created,
+            "idle": self._idle.qsize(),
+            "hits": int(self._stats.count("hit")),
+            "misses": int(self._stats.count("miss")),
+            "waits": int(self._stats.count("wait")),
+            "wait_p50_s": self._stats.percentile("wait_seconds", 0.50),
+            "wait_p99_s": self._stats.percentile("wait_seconds", 0.99),
+        }
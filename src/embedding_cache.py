@@ -0,0 +1,212 @@
+"""Content-addressed on-disk cache of document embeddings."""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src import metrics
+
+def content_key(model_name: str, text: str) -> str:
+    """Cache key for text embedded by model_name."""
+    return hashlib.sha1(f"{model_name}\0{text}".encode()).hexdigest()
+
+class EmbeddingCache:
+    """Append-only vector store keyed by a hash of (model, text).
+
+    ``keys.txt`` holds one key per line and ``vectors.bin`` the matching rows as
+    raw float16/float32, so reads memory-map the file and new vectors append
+    without rewriting what is already cached.
+    """
+
+    def __init__(self, directory: Path, model_name: str, dtype: str = "float16"):
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.dim = None
+        self._rows = {}
+        self._vectors = None
+        self._lock = threading.Lock()
+        self._load()
+
+    @property
+    def _meta_path(self):
+        return self.directory / "meta.json"
+
+    def _load(self):
+        if not self._meta_path.exists():
+            return
+        meta = json.loads(self._meta_path.read_text())
+        if meta["model"] != self.model_name or meta["dtype"] != self.dtype.name:
+            return
+        self.dim = meta["dim"]
+        keys_path = self.directory / "keys.txt"
+        keys = keys_path.read_text().split() if keys_path.exists() else []
+        vectors_path = self.directory / "vectors.bin"
+        rows = vectors_path.stat().st_size // (self.dim * self.dtype.itemsize) if vectors_path.exists() else 0
+        # A crash between the two appends leaves them uneven; trust the shorter one.
+        keys = keys[:rows]
+        if keys:
+            self._vectors = np.memmap(vectors_path, dtype=self.dtype, mode="r", shape=(len(keys), self.dim))
+        self._rows = {key: i for i, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, texts: list) -> list:
+        """Cached float32 vectors for texts, None where missing."""
+        out = []
+        with self._lock:
+            for text in texts:
+                row = self._rows.get(content_key(self.model_name, text))
+                out.append(None if row is None else np.asarray(self._vectors[row], dtype=np.float32))
+        hits = sum(v is not None for v in out)
+        metrics.incr("embedding_cache.hit", hits)
+        metrics.incr("embedding_cache.miss", len(out) - hits)
+        return out
+
+    def add_many(self, texts: list, vectors: list):
+        """Append vectors for texts that are not cached yet."""
+        if not texts:
+            return
+        array = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = array.shape[1]
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._meta_path.write_text(json.dumps(
+                    {"model": self.model_name, "dim": self.dim, "dtype": self.dtype.name}
+                ))
+                for name in ("keys.txt", "vectors.bin"):
+                    (self.directory / name).unlink(missing_ok=True)
+            keys, rows, seen = [], [], set()
+            for text, vector in zip(texts, array):
+                key = content_key(self.model_name, text)
+                if key not in self._rows and key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                    rows.append(vector)
+            if not keys:
+                return
+            with open(self.directory / "vectors.bin", "ab") as f:
+                np.asarray(rows, dtype=self.dtype).tofile(f)
+            with open(self.directory / "keys.txt", "a") as f:
+                f.write("".join(f"{key}\n" for key in keys))
+            start = len(self._rows)
+            self._rows.update({key: start + i for i, key in enumerate(keys)})
+            self._vectors = np.memmap(
+                self.directory / "vectors.bin", dtype=self.dtype, mode="r", shape=(len(self._rows), self.dim)
+            )
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves documents from an EmbeddingCache."""
+
+    def __init__(self, base: Embeddings, cache: EmbeddingCache):
+        self.base = base
+        self.cache = cache
+
+    def embed_documents(self, texts: list) -> list:
+        vectors = self.cache.get_many(texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = self.base.embed_documents([texts[i] for i in missing])
+            self.cache.add_many([texts[i] for i in missing], fresh)
+            # Round-trip through the cache dtype so fresh and cached vectors agree.
+            for i, vector in zip(missing, fresh):
+                vectors[i] = np.asarray(vector, dtype=self.cache.dtype).astype(np.float32)
+        return [v.tolist() for v in vectors]
+
+    def embed_query(self, text: str) -> list:
+        return self.base.embed_query(text)
+
+_SPACE = re.compile(r"\s+")
+
+def normalize_query(text: str) -> str:
+    """Fold case and whitespace; the MiniLM tokenizer is uncased, so vectors are unchanged."""
+    return _SPACE.sub(" ", text).strip().lower()
+
+class QueryEmbeddingCache:
+    """Bounded LRU of query vectors keyed by normalized query text.
+
+    With ``warm_path`` set, the most recently used entries are loaded at
+    construction and written back by ``save()``, so a new process starts hot.
+    """
+
+    def __init__(self, embed_query, model_name: str, max_entries: int = 2048, warm_path: str = ""):
+        self.embed_query = embed_query
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.warm_path = Path(warm_path) if warm_path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = metrics.Recorder("query_embedding")
+        if self.warm_path and self.warm_path.exists():
+            self._load()
+
+    def _load(self):
+        with np.load(self.warm_path, allow_pickle=False) as data:
+            if str(data["model"]) != self.model_name:
+                return
+            keys, vectors = list(data["keys"]), data["vectors"]
+        for key, vector in zip(keys[-self.max_entries:], vectors[-self.max_entries:]):
+            self._entries[str(key)] = vector.tolist()
+        self._stats.incr("warm_loaded", len(self._entries))
+
+    def save(self):
+        """Write the cache to warm_path atomically (least recently used first)."""
+        if not self.warm_path:
+            return
+        with self._lock:
+            keys = list(self._entries)
+            vectors = np.asarray(list(self._entries.values()), dtype=np.float32)
+        if not keys:
+            return
+        self.warm_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.warm_path.with_name(self.warm_path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, model=np.array(self.model_name), keys=np.array(keys), vectors=vectors)
+        os.replace(tmp, self.warm_path)
+
+    def embed(self, text: str) -> list:
+        """Vector for text, computed by embed_query only on a miss."""
+        key = normalize_query(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+        if vector is not None:
+            self._stats.incr("hit")
+            return vector
+        self._stats.incr("miss")
+        start = time.perf_counter()
+        vector = self.embed_query(key)
+        self._stats.observe("embed_seconds", time.perf_counter() - start)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Entry count, hit ratio and p50/p99 latency of the underlying embed call."""
+        hits = self._stats.count("hit")
+        misses = self._stats.count("miss")
+        return {
+            "entries": len(self._entries),
+            "hits": int(hits),
+            "misses": int(misses),
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "embed_p50_ms": self._stats.percentile("embed_seconds", 0.50) * 1000,
+            "embed_p99_ms": self._stats.percentile("embed_seconds", 0.99) * 1000,
+        }
@@ -0,0 +1,213 @@
+"""Streaming index build: lazy documents, batched embedding across processes, incremental adds.
+
+Documents are consumed in batches. Each batch is looked up in the embedding
+cache, and only the misses are embedded: in-process with the shared model, or
+on a pool of spawned processes that each load their own model with a capped
+number of torch threads, so workers don't oversubscribe the CPUs. Vectors are
+added to the FAISS index as batches come back, in input order, with a bounded
+number of batches in flight. Indexes that need training (IVF, PQ, SQ) buffer
+up to settings.faiss_train_sample vectors first.
+"""
+import logging
+import multiprocessing
+import os
+import resource
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from src import metrics
+from src.config import get_settings
+from src.data_loader import faiss_factory_string, get_embeddings, new_faiss_index
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+def batched(iterable, size: int):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+class Encoder:
+    """Picklable recipe for the sentence-transformers model an embedding process loads once."""
+
+    def __init__(self, model_name: str, batch_size: int = 64, threads: int = 1):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.threads = threads
+        self._model = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_model": None}
+
+    def load(self):
+        # Must run before torch starts its thread pool.
+        for var in THREAD_VARS:
+            os.environ[var] = str(self.threads)
+        os.environ["TOKENIZERS_PARALLELISM"] = "false"
+        import torch
+        from sentence_transformers import SentenceTransformer
+        torch.set_num_threads(self.threads)
+        self._model = SentenceTransformer(self.model_name)
+
+    def __call__(self, texts: list) -> np.ndarray:
+        return self._model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True).astype(np.float32)
+
+class SharedEncoder:
+    """In-process encoder over the process-wide model from data_loader.get_embeddings()."""
+
+    def load(self):
+        pass
+
+    def __call__(self, texts: list) -> np.ndarray:
+        return np.asarray(get_embeddings().base.embed_documents(texts), dtype=np.float32)
+
+_worker_encoder = None
+
+def _init_worker(encoder):
+    global _worker_encoder
+    encoder.load()
+    _worker_encoder = encoder
+
+def _encode(texts: list) -> np.ndarray:
+    return _worker_encoder(texts)
+
+def embed_stream(batches, encoder, workers: int = 0):
+    """Vectors for each batch of texts, in order; empty batches yield [] without a round trip.
+
+    With workers > 1, batches go to that many spawned processes (fork after
+    torch has started threads can deadlock) and at most 2 * workers are in
+    flight, so the input is read only as fast as it is embedded.
+    """
+    if workers <= 1:
+        encoder.load()
+        for texts in batches:
+            yield encoder(texts) if texts else []
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(encoder,)) as pool:
+        pending = deque()
+        for texts in batches:
+            pending.append(pool.submit(_encode, texts) if texts else None)
+            if len(pending) >= 2 * workers:
+                future = pending.popleft()
+                yield future.result() if future else []
+        while pending:
+            future = pending.popleft()
+            yield future.result() if future else []
+
+def default_encoder(workers: int):
+    """Encoder for `workers` processes from settings; threads default to an even split of the CPUs."""
+    if workers <= 1:
+        return SharedEncoder()
+    threads = settings.embed_threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    return Encoder(settings.embedding_model, settings.embed_batch_size, threads)
+
+def peak_memory_mb() -> dict:
+    """Peak RSS of this process and of the largest finished child, in MB (Linux reports KB)."""
+    return {
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "worker_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+class _StoreBuilder:
+    """Adds (documents, vectors) batches to a FAISS store, creating and training it on first need."""
+
+    def __init__(self, embeddings, index_type: str = None):
+        self.embeddings = embeddings
+        self.index_type = index_type
+        self.store = None
+        self.factory = None
+        self._needs_training = None
+        self._buffer = []
+        self._buffered = 0
+
+    def add(self, docs: list, vectors: np.ndarray):
+        if self.store is not None:
+            self._append(docs, vectors)
+            return
+        if self._needs_training is None:
+            import faiss
+            factory = faiss_factory_string(settings.faiss_train_sample, self.index_type)
+            self._needs_training = not faiss.index_factory(vectors.shape[1], factory).is_trained
+        self._buffer.append((docs, vectors))
+        self._buffered += len(docs)
+        if not self._needs_training or self._buffered >= settings.faiss_train_sample:
+            self._create(self._buffered)
+
+    def finish(self):
+        if self.store is None and self._buffer:
+            self._create(self._buffered)
+        return self.store, self.factory
+
+    def _create(self, count: int):
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        from langchain_community.vectorstores import FAISS
+        sample = np.concatenate([vectors for _, vectors in self._buffer])
+        index, self.factory = new_faiss_index(sample, faiss_factory_string(count, self.index_type))
+        self.store = FAISS(self.embeddings, index, InMemoryDocstore(), {})
+        for docs, vectors in self._buffer:
+            self._append(docs, vectors)
+        self._buffer = []
+
+    def _append(self, docs: list, vectors: np.ndarray):
+        with metrics.span("build.faiss"):
+            self.store.add_embeddings(
+                zip([doc.page_content for doc in docs], vectors),
+                metadatas=[doc.metadata for doc in docs],
+                ids=[doc.id for doc in docs],
+            )
+
+def build_store(docs, embeddings, cache=None, encoder=None, workers: int = None,
+                batch_size: int = None, index_type: str = None) -> tuple:
+    """Embed and index an iterable of documents; returns (store, factory, report).
+
+    ``embeddings`` is the query-side Embeddings the store keeps; ``cache`` an
+    EmbeddingCache consulted before and filled after embedding. The report
+    has documents, embedded (cache misses), seconds, docs_per_sec and peak
+    memory. Raises ValueError when docs is empty.
+    """
+    workers = settings.embed_workers if workers is None else workers
+    batch_size = batch_size or settings.embed_batch_size
+    encoder = encoder or default_encoder(workers)
+    builder = _StoreBuilder(embeddings, index_type)
+    pending = deque()
+    counts = {"documents": 0, "embedded": 0}
+
+    def misses():
+        for batch in batched(docs, batch_size):
+            texts = [doc.page_content for doc in batch]
+            vectors = cache.get_many(texts) if cache is not None else [None] * len(texts)
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            pending.append((batch, texts, vectors, missing))
+            yield [texts[i] for i in missing]
+
+    start = time.perf_counter()
+    for fresh in embed_stream(misses(), encoder, workers):
+        batch, texts, vectors, missing = pending.popleft()
+        if missing:
+            if cache is not None:
+                cache.add_many([texts[i] for i in missing], fresh)
+                # Round-trip through the cache dtype so fresh and cached vectors agree.
+                fresh = np.asarray(fresh, dtype=cache.dtype).astype(np.float32)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        builder.add(batch, np.asarray(vectors, dtype=np.float32))
+        counts["documents"] += len(batch)
+        counts["embedded"] += len(missing)
+        metrics.incr("ingest.documents", len(batch))
+    store, factory = builder.finish()
+    if store is None:
+        raise ValueError("no FAQ documents to index")
+    seconds = time.perf_counter() - start
+    report = {**counts, "seconds": seconds, "docs_per_sec": counts["documents"] / seconds if seconds else 0.0,
+              **peak_memory_mb()}
+    logger.info("Indexed %d documents (%d embedded) in %.1fs, %.0f docs/sec", counts["documents"],
+                counts["embedded"], seconds, report["docs_per_sec"])
+    return store, factory, report
@@ -0,0 +1,101 @@
+"""Model-call timing, per-request stage traces and the /metrics endpoint.
+
+ModelCallMetrics is created on first access, so importing request_trace or
+mount doesn't load langchain.agents.
+"""
+import functools
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from src import metrics
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+@functools.cache
+def _model_call_metrics():
+    # Defined on first use: the AgentMiddleware base loads langchain.agents,
+    # which the AgentCore runtime defers until it builds the agent.
+    from langchain.agents.middleware import AgentMiddleware
+
+    class ModelCallMetrics(AgentMiddleware):
+        """Times each model call as llm.call and records provider token usage.
+
+        Place it last in the middleware list so the span covers the provider call
+        alone, not compaction or other middleware. Records llm.input_tokens and
+        llm.output_tokens from the response's usage metadata.
+        """
+
+        @staticmethod
+        def _record_usage(response):
+            for message in getattr(response, "result", None) or [response]:
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    metrics.observe("llm.input_tokens", usage["input_tokens"])
+                    metrics.observe("llm.output_tokens", usage["output_tokens"])
+
+        def wrap_model_call(self, request, handler):
+            with metrics.span("llm.call"):
+                response = handler(request)
+            self._record_usage(response)
+            return response
+
+        async def awrap_model_call(self, request, handler):
+            with metrics.span("llm.call"):
+                response = await handler(request)
+            self._record_usage(response)
+            return response
+
+    ModelCallMetrics.__qualname__ = "ModelCallMetrics"
+    return ModelCallMetrics
+
+def __getattr__(name: str):
+    if name == "ModelCallMetrics":
+        return _model_call_metrics()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@contextmanager
+def request_trace(name: str):
+    """Time one request as `<name>_seconds`; log its stage breakdown when slower than slow_request_s.
+
+    Spans finished inside the request (tools, model calls, memory hooks) are
+    collected through a context variable, so concurrent requests don't mix.
+    """
+    start = time.perf_counter()
+    with metrics.trace() as stages:
+        try:
+            yield stages
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe(f"{name}_seconds", elapsed)
+            if elapsed > settings.slow_request_s:
+                metrics.incr(f"{name}.slow")
+                breakdown = ", ".join(f"{stage}={seconds * 1000:.0f}ms"
+                                      for stage, seconds in metrics.stage_totals(stages).items())
+                logger.warning("Slow %s: %.2fs (%s)", name, elapsed, breakdown or "no spans")
+
+def render(fmt: str = "prometheus") -> tuple:
+    """(body, media type) for the current metrics, with process memory as gauges."""
+    for name, value in metrics.process_memory().items():
+        metrics.gauge(f"process.{name}", value)
+    if fmt == "json":
+        return json.dumps(metrics.snapshot()), "application/json"
+    return metrics.prometheus(), "text/plain; version=0.0.4"
+
+def mount(app):
+    """Serve GET /metrics (Prometheus text, or JSON with ?format=json) on a Starlette app.
+
+    Metrics are per process: with `serve --workers N` each scrape reaches
+    whichever worker accepts the connection.
+    """
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    async def endpoint(request):
+        body, media_type = render(request.query_params.get("format", "prometheus"))
+        return Response(body, media_type=media_type)
+
+    app.router.routes.append(Route("/metrics", endpoint, methods=["GET"]))
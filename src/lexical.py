@@ -0,0 +1,78 @@
+"""BM25 inverted index over FAQ documents and rank fusion helpers."""
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+
+_WORD = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+    a an the i my me do does did how what which when where who why is are was be
+    to of for in on at by with from and or it its you your we our can this that
+""".split())
+
+def tokenize(text: str) -> list:
+    """Lowercased word tokens without stopwords."""
+    return [t for t in _WORD.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of texts, searched in memory."""
+
+    def __init__(self, ids: list, texts: list, k1: float = 1.5, b: float = 0.75):
+        self.ids = ids
+        self.texts = texts
+        self.k1 = k1
+        self.b = b
+        self.terms = [Counter(tokenize(text)) for text in texts]
+        lengths = [sum(tf.values()) for tf in self.terms]
+        avg = sum(lengths) / len(lengths) if lengths else 1.0
+        self.postings = {}
+        for i, tf in enumerate(self.terms):
+            norm = k1 * (1 - b + b * lengths[i] / avg)
+            for term, count in tf.items():
+                self.postings.setdefault(term, []).append((i, count * (k1 + 1) / (count + norm)))
+        n = len(texts)
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def from_documents(cls, docs) -> "BM25Index":
+        docs = list(docs)
+        return cls([doc.id for doc in docs], [doc.page_content for doc in docs])
+
+    def save(self, path: Path):
+        Path(path).write_text(json.dumps({"ids": self.ids, "texts": self.texts, "k1": self.k1, "b": self.b}))
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        data = json.loads(Path(path).read_text())
+        return cls(data["ids"], data["texts"], data["k1"], data["b"])
+
+    def search(self, query: str, k: int) -> list:
+        """Top-k (doc index, score) pairs, best first."""
+        scores = {}
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i, weight in self.postings[term]:
+                scores[i] = scores.get(i, 0.0) + idf * weight
+        return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+    def confident(self, query: str, hits: list, margin: float) -> bool:
+        """True when the top hit contains every query term and clearly beats the runner-up."""
+        terms = set(tokenize(query))
+        if len(terms) < 2 or not hits or not terms <= self.terms[hits[0][0]].keys():
+            return False
+        return len(hits) == 1 or hits[0][1] >= margin * hits[1][1]
+
+def reciprocal_rank_fusion(rankings: list, k: int = 60) -> list:
+    """Merge ranked lists of keys by sum of 1 / (k + rank)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda key: -scores[key])
@@ -0,0 +1,191 @@
+"""Write-behind buffer for conversation memory: batched, deduplicated, off the request path."""
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from langchain.agents.middleware import AgentMiddleware, AgentState
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.config import get_config
+from langgraph.store.base import BaseStore, PutOp
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+def message_key(message: BaseMessage) -> str:
+    """Stable store key: the message id, or a content hash for messages without one."""
+    if message.id:
+        return message.id
+    return hashlib.sha1(f"{message.type}\0{message.content}".encode()).hexdigest()
+
+class MemoryWriter:
+    """Buffers store puts per (actor_id, thread_id) and writes them from a background thread.
+
+    Puts return immediately. A message among the last ``max_seen_per_thread``
+    queued for its namespace is skipped, so tool loops that re-run model hooks
+    write each message once; older keys are forgotten, and a repeat of one
+    would overwrite the same store key. Buffered puts are flushed as one store.batch() per namespace
+    when ``batch_size`` are pending, every ``flush_interval_s``, and on close().
+    A failed batch is retried with exponential backoff up to ``max_retries``
+    times, then dropped and logged. Keys are message ids, so a retried batch
+    overwrites rather than duplicates in key-value stores.
+    """
+
+    def __init__(self, store: BaseStore, batch_size: int = 32, flush_interval_s: float = 1.0,
+                 max_retries: int = 5, retry_backoff_s: float = 0.5, max_pending: int = 10_000,
+                 max_threads: int = 10_000, max_seen_per_thread: int = 256):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.max_pending = max_pending
+        self.max_threads = max_threads
+        self.max_seen_per_thread = max_seen_per_thread
+        self._pending = OrderedDict()  # namespace -> [PutOp]
+        self._retries = []  # (due, attempt, namespace, [PutOp])
+        self._seen = OrderedDict()  # namespace -> OrderedDict of recent keys, LRU over threads and keys
+        self._count = 0  # puts in _pending
+        self._retrying = 0  # puts in _retries
+        self._inflight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, namespace: tuple, message: BaseMessage) -> bool:
+        """Queue a message for namespace; False if it was a duplicate or the buffer is full."""
+        key = message_key(message)
+        with self._cond:
+            seen = self._seen.setdefault(namespace, OrderedDict())
+            self._seen.move_to_end(namespace)
+            if key in seen:
+                seen.move_to_end(key)
+                metrics.incr("memory.deduplicated")
+                return False
+            if self._closed or self._count + self._retrying >= self.max_pending:
+                metrics.incr("memory.dropped")
+                logger.warning("Memory buffer full; dropping message for %s", namespace)
+                return False
+            seen[key] = None
+            if len(seen) > self.max_seen_per_thread:
+                seen.popitem(last=False)
+            while len(self._seen) > self.max_threads:
+                self._seen.popitem(last=False)
+            self._pending.setdefault(namespace, []).append(PutOp(namespace, key, {"message": message}))
+            self._count += 1
+            metrics.incr("memory.queued")
+            if self._count >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wake the writer and wait until nothing is pending or in flight; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._count or self._retrying or self._inflight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Flush what is buffered (retrying without backoff) and stop the writer thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Memory writer did not finish within %.1fs; %d messages lost",
+                           timeout, self._count + self._retrying)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"pending": self._count, "threads": len(self._pending), "retrying": self._retrying}
+
+    def _take(self) -> list:
+        """Pop the batches that are due: all pending ones plus retries whose backoff has elapsed."""
+        now = time.monotonic()
+        due = [(attempt, ns, ops) for when, attempt, ns, ops in self._retries if when <= now or self._closed]
+        self._retries = [r for r in self._retries if r[0] > now and not self._closed]
+        self._retrying -= sum(len(ops) for _, _, ops in due)
+        due += [(0, ns, ops) for ns, ops in self._pending.items()]
+        self._pending.clear()
+        self._count = 0
+        self._inflight = sum(len(ops) for _, _, ops in due)
+        return due
+
+    def _next_wait(self) -> float:
+        wait = self.flush_interval_s
+        if self._retries:
+            wait = min(wait, min(r[0] for r in self._retries) - time.monotonic())
+        return max(wait, 0.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and self._count < self.batch_size:
+                    self._cond.wait(self._next_wait())
+                if self._closed and not self._count and not self._retrying:
+                    break
+                batches = self._take()
+            for attempt, namespace, ops in batches:
+                self._write(attempt, namespace, ops)
+            with self._cond:
+                self._inflight = 0
+                self._cond.notify_all()
+
+    def _write(self, attempt: int, namespace: tuple, ops: list):
+        start = time.perf_counter()
+        try:
+            self.store.batch(ops)
+        except Exception:
+            metrics.incr("memory.write_errors")
+            if attempt >= self.max_retries:
+                metrics.incr("memory.dropped", len(ops))
+                logger.exception("Dropping %d memory writes for %s after %d retries", len(ops), namespace, attempt)
+                return
+            with self._cond:
+                due = time.monotonic() + self.retry_backoff_s * 2 ** attempt
+                self._retries.append((due, attempt + 1, namespace, ops))
+                self._retrying += len(ops)
+            logger.warning("Memory write for %s failed (attempt %d); retrying", namespace, attempt + 1)
+            return
+        metrics.observe("memory.batch_seconds", time.perf_counter() - start)
+        metrics.observe("memory.batch_size", len(ops))
+        metrics.incr("memory.written", len(ops))
+
+
+class MemoryMiddleware(AgentMiddleware):
+    """Records the latest human message before each model call and the reply after it.
+
+    Writes go through a MemoryWriter, so the model step never waits on the store.
+    """
+
+    def __init__(self, writer: MemoryWriter):
+        super().__init__()
+        self.writer = writer
+
+    def _record(self, state: AgentState, message_type: type):
+        configurable = get_config().get("configurable", {})
+        namespace = (configurable.get("actor_id", "default"), configurable.get("thread_id", "default"))
+        for msg in reversed(state.get("messages", [])):
+            if isinstance(msg, message_type):
+                self.writer.put(namespace, msg)
+                break
+
+    def before_model(self, state: AgentState, runtime) -> None:
+        with metrics.span("memory.before_model"):
+            self._record(state, HumanMessage)
+
+    def after_model(self, state: AgentState, runtime) -> None:
+        with metrics.span("memory.after_model"):
+            self._record(state, AIMessage)
@@ -0,0 +1,215 @@
+"""Process-wide counters, gauges, timing summaries and per-request stage traces.
+
+With settings.metrics_enabled off every call here returns immediately, and
+span() hands back a shared no-op context manager.
+"""
+import functools
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from src.config import get_settings
+
+SAMPLE_SIZE = 1024
+
+_enabled = get_settings().metrics_enabled
+_trace = ContextVar("metrics_trace", default=None)
+_NOOP = nullcontext()
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_totals = defaultdict(lambda: [0, 0.0, 0.0])  # count, sum, max
+_samples = defaultdict(lambda: deque(maxlen=SAMPLE_SIZE))
+_gauges = {}
+
+def enable(on: bool = True):
+    global _enabled
+    _enabled = on
+
+def incr(name: str, value: float = 1):
+    """Add value to a counter."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += value
+
+def observe(name: str, value: float):
+    """Record one observation (e.g. a latency in seconds)."""
+    if not _enabled:
+        return
+    with _lock:
+        total = _totals[name]
+        total[0] += 1
+        total[1] += value
+        total[2] = max(total[2], value)
+        _samples[name].append(value)
+
+def gauge(name: str, value: float):
+    """Set a point-in-time value (e.g. items held)."""
+    if not _enabled:
+        return
+    with _lock:
+        _gauges[name] = value
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        observe(f"{self.name}_seconds", elapsed)
+        stages = _trace.get()
+        if stages is not None:
+            stages.append((self.name, elapsed))
+
+def span(name: str):
+    """Time a block as `<name>_seconds`, and add it to the current request trace if any."""
+    return _Span(name) if _enabled else _NOOP
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def trace():
+    """Collect (stage, seconds) for every span finished in this context, including tool threads."""
+    stages = []
+    token = _trace.set(stages)
+    try:
+        yield stages
+    finally:
+        _trace.reset(token)
+
+def stage_totals(stages: list) -> dict:
+    """Seconds per stage name, slowest first."""
+    totals = defaultdict(float)
+    for name, seconds in stages:
+        totals[name] += seconds
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+def percentile(ordered: list, q: float) -> float:
+    """q-quantile (nearest rank) of an already sorted, non-empty list."""
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def latency_percentiles(latencies: list, quantiles=(0.50, 0.95, 0.99)) -> dict:
+    """{"p50_ms": ..., "p95_ms": ..., "p99_ms": ...} for latencies in seconds; None each when empty."""
+    ordered = sorted(latencies)
+    return {f"p{round(q * 100)}_ms": percentile(ordered, q) * 1000 if ordered else None for q in quantiles}
+
+class Recorder:
+    """Counters and recent samples owned by one object (a pool, a cache).
+
+    They are kept whether or not metrics are enabled, so per-object stats()
+    stay accurate; every call is also forwarded to the process-wide metrics
+    as `<prefix>.<name>`.
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._samples = defaultdict(lambda: deque(maxlen=SAMPLE_SIZE))
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self._counters[name] += value
+        incr(f"{self.prefix}.{name}", value)
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            self._samples[name].append(value)
+        observe(f"{self.prefix}.{name}", value)
+
+    def count(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def percentile(self, name: str, q: float) -> float:
+        """q-quantile of the recent samples of name (0.0 before any)."""
+        with self._lock:
+            ordered = sorted(self._samples.get(name, ()))
+        return percentile(ordered, q) if ordered else 0.0
+
+def snapshot() -> dict:
+    """Return counters, gauges and summaries (count/sum/max/p50/p99 over recent samples)."""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        summaries = {}
+        for name, (count, total, peak) in _totals.items():
+            ordered = sorted(_samples[name])
+            summaries[name] = {
+                "count": count,
+                "sum": total,
+                "max": peak,
+                "p50": percentile(ordered, 0.50),
+                "p99": percentile(ordered, 0.99),
+            }
+    return {"counters": counters, "gauges": gauges, "summaries": summaries}
+
+def reset():
+    """Clear all metrics."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _totals.clear()
+        _samples.clear()
+
+def process_memory() -> dict:
+    """Resident memory of this process in MB (Linux /proc; empty elsewhere).
+
+    rss counts shared pages in full; pss splits them across the processes
+    mapping them, so summing pss over workers gives their real footprint.
+    """
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Anonymous": "anon_mb", "Shared_Clean": "shared_mb"}
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    out[fields[key]] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return out
+
+def _prometheus_name(prefix: str, name: str) -> str:
+    return f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+def prometheus(prefix: str = "telecom_agent") -> str:
+    """snapshot() in the Prometheus text exposition format."""
+    snap = snapshot()
+    lines = []
+    for name, value in sorted(snap["counters"].items()):
+        metric = _prometheus_name(prefix, name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for name, value in sorted(snap["gauges"].items()):
+        metric = _prometheus_name(prefix, name)
+        lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    for name, summary in sorted(snap["summaries"].items()):
+        metric = _prometheus_name(prefix, name)
+        lines += [
+            f"# TYPE {metric} summary",
+            f'{metric}{{quantile="0.5"}} {summary["p50"]}',
+            f'{metric}{{quantile="0.99"}} {summary["p99"]}',
+            f"{metric}_sum {summary['sum']}",
+            f"{metric}_count {summary['count']}",
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+"""LRU + TTL cache for query_customers results."""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from src import metrics
+
+_TOKEN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\s+|\w+|.", re.S)
+
+KEYWORDS = frozenset("""
+    SELECT DISTINCT ALL FROM WHERE AND OR NOT IN IS NULL LIKE GLOB BETWEEN CASE WHEN
+    THEN ELSE END AS ON JOIN INNER LEFT RIGHT FULL OUTER CROSS NATURAL USING GROUP BY
+    HAVING ORDER ASC DESC LIMIT OFFSET UNION INTERSECT EXCEPT WITH RECURSIVE EXISTS
+    CAST COLLATE NOCASE COUNT SUM AVG MIN MAX TOTAL ROUND ABS LENGTH LOWER UPPER
+    COALESCE IFNULL NULLIF SUBSTR TRIM REPLACE INSTR PRINTF GROUP_CONCAT
+""".split())
+
+def normalize_sql(sql: str) -> str:
+    """Canonical cache key for a query: keyword case and whitespace folded.
+
+    String literals and identifiers are kept verbatim; whitespace between a word
+    and punctuation is dropped, other runs collapse to one space.
+    """
+    out = []
+    pending_space = False
+    prev_word = None
+    for tok in _TOKEN.findall(sql.strip().rstrip(";").strip()):
+        if tok.isspace():
+            pending_space = True
+            continue
+        is_word = tok[0].isalnum() or tok[0] in "_'\""
+        if pending_space and prev_word is not None and prev_word == is_word:
+            out.append(" ")
+        pending_space = False
+        prev_word = is_word
+        out.append(tok.upper() if tok.upper() in KEYWORDS else tok)
+    return "".join(out)
+
+class QueryCache:
+    """Thread-safe LRU cache with per-entry TTL; tracks hit rate and time saved."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = metrics.Recorder("query_cache")
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expiry."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            self._stats.incr("miss")
+            return None
+        self._stats.incr("hit")
+        self._stats.incr("saved_seconds", entry[2])
+        return entry[0]
+
+    def put(self, key, value, cost_s: float = 0.0):
+        """Store value; cost_s is the execution time a future hit will save."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_s, cost_s)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Entry count, hit rate and cumulative execution time saved by this cache."""
+        hits = self._stats.count("hit")
+        misses = self._stats.count("miss")
+        return {
+            "entries": len(self._entries),
+            "hits": int(hits),
+            "misses": int(misses),
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "saved_seconds": self._stats.count("saved_seconds"),
+        }
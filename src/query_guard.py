@@ -0,0 +1,115 @@
+"""Cost guard and execution budget for model-generated SQL."""
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from src import metrics
+
+PROGRESS_INTERVAL = 10_000
+
+HINTS = {
+    "cross_join": "Avoid self-joins/cartesian products; aggregate in a single pass instead.",
+    "correlated_scan": "Replace the correlated subquery with a GROUP BY or a JOIN on a key.",
+    "full_scan": "Add a WHERE filter on an indexed column or aggregate instead of listing rows.",
+    "timeout": "Narrow the query with filters, LIMIT or aggregates.",
+    "vm_steps": "Narrow the query with filters, LIMIT or aggregates.",
+}
+
+class QueryTooExpensive(Exception):
+    """Raised when a query is rejected up front or exceeds its execution budget."""
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(f"{reason}: {detail}")
+        self.reason = reason
+        self.detail = detail
+
+    def to_result(self) -> str:
+        """Tool-facing message the agent can react to."""
+        return f"Query too expensive [{self.reason}]: {self.detail}. {HINTS[self.reason]}"
+
+def _full_scan_target(detail: str):
+    """Return the scanned name for a full-scan plan step, else None."""
+    if not detail.startswith("SCAN ") or detail == "SCAN CONSTANT ROW":
+        return None
+    return detail[5:].split(" ", 1)[0]
+
+def check_plan(conn: sqlite3.Connection, sql: str, large_rows: int, max_scan_rows: int):
+    """Reject plans that nest full scans of a large table or scan a huge one.
+
+    EXPLAIN QUERY PLAN steps sharing a parent are nested-loop joins, so two full
+    scans among siblings are a cartesian product; a full scan inside a correlated
+    subquery runs once per outer row.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    ctes = {d.split(" ", 1)[1] for _, _, _, d in plan
+            if d.startswith(("CO-ROUTINE ", "MATERIALIZE "))}
+    scans = {}
+    for node, parent, _, detail in plan:
+        target = _full_scan_target(detail)
+        if target and target not in ctes:
+            scans[node] = parent
+    if not scans:
+        return
+
+    table_rows = conn.execute("SELECT MAX(rowid) FROM customers").fetchone()[0] or 0
+    if table_rows < large_rows:
+        return
+
+    by_parent = {}
+    for parent in scans.values():
+        by_parent[parent] = by_parent.get(parent, 0) + 1
+    nested = max(by_parent.values())
+    if nested > 1:
+        raise QueryTooExpensive("cross_join", f"{nested} nested full scans over ~{table_rows} rows")
+
+    parents = {node: parent for node, parent, _, _ in plan}
+    details = {node: detail for node, _, _, detail in plan}
+    for node in scans:
+        ancestor = parents.get(node)
+        while ancestor:
+            if details.get(ancestor, "").startswith("CORRELATED"):
+                raise QueryTooExpensive(
+                    "correlated_scan", f"full scan per outer row over ~{table_rows} rows"
+                )
+            ancestor = parents.get(ancestor)
+
+    if table_rows > max_scan_rows:
+        raise QueryTooExpensive("full_scan", f"no usable index for a scan of ~{table_rows} rows")
+
+@contextmanager
+def execution_budget(conn: sqlite3.Connection, timeout_s: float, max_steps: int):
+    """Interrupt statements on conn that run past a wall-clock or VM-step budget."""
+    deadline = time.monotonic() + timeout_s
+    state = {"steps": 0, "reason": None}
+
+    def progress():
+        state["steps"] += PROGRESS_INTERVAL
+        if state["steps"] > max_steps:
+            state["reason"] = "vm_steps"
+        elif time.monotonic() > deadline:
+            state["reason"] = "timeout"
+        return 1 if state["reason"] else 0
+
+    conn.set_progress_handler(progress, PROGRESS_INTERVAL)
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if state["reason"] == "timeout":
+            raise QueryTooExpensive("timeout", f"exceeded {timeout_s}s") from e
+        if state["reason"] == "vm_steps":
+            raise QueryTooExpensive("vm_steps", f"exceeded {max_steps} VM steps") from e
+        raise
+    finally:
+        conn.set_progress_handler(None, PROGRESS_INTERVAL)
+
+@contextmanager
+def guarded(conn: sqlite3.Connection, sql: str, settings):
+    """Plan check plus execution budget; violations are counted in metrics."""
+    try:
+        check_plan(conn, sql, settings.query_large_table_rows, settings.query_max_scan_rows)
+        with execution_budget(conn, settings.query_timeout_s, settings.query_max_vm_steps):
+            yield
+    except QueryTooExpensive as e:
+        metrics.incr("query_guard.rejected")
+        metrics.incr(f"query_guard.{e.reason}")
+        raise
@@ -0,0 +1,78 @@
+"""Rule-based pre-router that runs the obvious tool before the first model call."""
+import re
+import time
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src import metrics
+
+# (tool, pattern, weight); a tool's score is the noisy-OR of its matching weights.
+RULES = [
+    ("get_stats", r"\b(overview|summary|summari[sz]e|snapshot|at a glance)\b", 0.9),
+    ("get_stats", r"\bcustomer base\b", 0.5),
+    ("query_customers", r"^\s*how many\b", 0.9),
+    ("query_customers", r"\b(average|avg|mean|median|count|number of|percentage|percent|proportion|"
+                        r"rate|ratio|sum|total|maximum|minimum|highest|lowest|distribution|breakdown)\b", 0.6),
+    ("query_customers", r"\b(customers|churn(ed|ers)?|tenure|monthly charges?|senior citizens?|contracts)\b", 0.3),
+    ("search_faq", r"^\s*(how (do|can|should|would) (i|we)|how to|can i|is it possible|what happens|why|where)\b", 0.8),
+    ("search_faq", r"^\s*(what|which|is|are|does|do|when)\b", 0.4),
+    ("search_faq", r"\b(roaming|sim|esim|kyc|ussd|recharge|bill|autopay|refund|port(ing)?|activat(e|ion)|"
+                   r"voicemail|plans?|pack|5g|4g|volte|hotspot|network|complaint|dispute|otp)\b", 0.6),
+]
+
+_COMPILED = [(tool, re.compile(pattern, re.I), weight) for tool, pattern, weight in RULES]
+
+# Tools whose arguments follow from the prompt alone; query_customers needs model-written SQL.
+PRE_RUNNABLE = ("search_faq", "get_stats")
+
+def classify(prompt: str) -> tuple:
+    """Return (tool, confidence); confidence discounts the runner-up's score."""
+    scores = {}
+    for tool, pattern, weight in _COMPILED:
+        if pattern.search(prompt):
+            scores[tool] = 1 - (1 - scores.get(tool, 0.0)) * (1 - weight)
+    if not scores:
+        return None, 0.0
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    return ranked[0][0], ranked[0][1] * (1 - runner_up)
+
+def _route(prompt: str, threshold: float):
+    """Pre-runnable tool and its arguments for prompt, or None to let the model route."""
+    start = time.perf_counter()
+    tool, confidence = classify(prompt)
+    metrics.observe("router.classify_seconds", time.perf_counter() - start)
+    if tool not in PRE_RUNNABLE or confidence < threshold:
+        metrics.incr("router.fallback")
+        return None
+    metrics.incr(f"router.routed.{tool}")
+    return tool, {"query": prompt} if tool == "search_faq" else {}
+
+def _injected(prompt: str, tool: str, args: dict, output: str) -> list:
+    call_id = f"call_{uuid.uuid4().hex[:12]}"
+    return [
+        HumanMessage(prompt),
+        AIMessage("", tool_calls=[{"name": tool, "args": args, "id": call_id}]),
+        ToolMessage(output, tool_call_id=call_id, name=tool),
+    ]
+
+def preroute(prompt: str, tools: list, threshold: float) -> list:
+    """Input messages for the agent, with the routed tool's result already attached.
+
+    Below the threshold (or for tools that need model-written arguments) this is
+    just the human message and the agent routes as usual.
+    """
+    route = _route(prompt, threshold)
+    if route is None:
+        return [HumanMessage(prompt)]
+    tool, args = route
+    return _injected(prompt, tool, args, {t.name: t for t in tools}[tool].invoke(args))
+
+async def apreroute(prompt: str, tools: list, threshold: float) -> list:
+    """Async preroute; the tool runs through its async implementation."""
+    route = _route(prompt, threshold)
+    if route is None:
+        return [HumanMessage(prompt)]
+    tool, args = route
+    return _injected(prompt, tool, args, await {t.name: t for t in tools}[tool].ainvoke(args))
@@ -0,0 +1,59 @@
+"""Agent graph streaming as token and tool-progress events.
+
+Events are plain dicts:
+  {"type": "tool_start", "tool": name, "args": {...}}
+  {"type": "tool_end", "tool": name}
+  {"type": "token", "content": text}
+  {"type": "done", "result": final answer}
+  {"type": "error", "error": message}
+"""
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
+
+STREAM_MODES = ["messages", "updates"]
+
+def tool_events(messages: list) -> list:
+    """tool_start/tool_end events for tool calls and results already in messages."""
+    events = []
+    for message in messages:
+        if isinstance(message, AIMessage):
+            events += [{"type": "tool_start", "tool": c["name"], "args": c["args"]} for c in message.tool_calls]
+        elif isinstance(message, ToolMessage):
+            events.append({"type": "tool_end", "tool": message.name})
+    return events
+
+class _Converter:
+    """Turns (mode, data) stream parts into events and remembers the final answer."""
+
+    def __init__(self):
+        self.answer = ""
+
+    def __call__(self, mode: str, data) -> list:
+        if mode == "messages":
+            chunk, metadata = data
+            if (isinstance(chunk, AIMessageChunk) and metadata.get("langgraph_node") == "model"
+                    and isinstance(chunk.content, str) and chunk.content):
+                return [{"type": "token", "content": chunk.content}]
+            return []
+        events = []
+        for update in data.values():
+            messages = (update or {}).get("messages", []) if isinstance(update, dict) else []
+            events += tool_events(messages)
+            for message in messages:
+                if isinstance(message, AIMessage) and not message.tool_calls:
+                    self.answer = message.content
+        return events
+
+def iter_events(agent, inputs: dict, config: dict = None):
+    """Stream a run of agent, ending with a done event carrying the full answer."""
+    convert = _Converter()
+    for mode, data in agent.stream(inputs, config=config, stream_mode=STREAM_MODES):
+        yield from convert(mode, data)
+    yield {"type": "done", "result": convert.answer}
+
+async def aiter_events(agent, inputs: dict, config: dict = None):
+    """Async iter_events."""
+    convert = _Converter()
+    async for mode, data in agent.astream(inputs, config=config, stream_mode=STREAM_MODES):
+        for event in convert(mode, data):
+            yield event
+    yield {"type": "done", "result": convert.answer}
@@ -1,7 +1,24 @@
+import atexit
+import time
 from langchain_core.tools import tool
-from src.data_loader import load_vector_store, get_db_connection
+from src import metrics
+from src.concurrency import run_blocking
+from src.config import get_settings
+from src.data_loader import (
+    load_vector_store, load_lexical_index, get_embeddings, get_db_pool, get_data_version, load_stats_snapshot, compute_stats_snapshot
+)
+from src.embedding_cache import QueryEmbeddingCache
+from src.lexical import reciprocal_rank_fusion
+from src.query_cache import QueryCache, normalize_sql
+from src.query_guard import QueryTooExpensive, guarded
+
+settings = get_settings()
 
 _store = None
+_lexical = None
+_query_embeddings = None
+_query_cache = QueryCache(settings.query_cache_size, settings.query_cache_ttl_s)
+_stats_text = (None, None)
 
 def _get_store():
     global _store
@@ -9,19 +26,123 @@ def _get_store():
         _store = load_vector_store()
     return _store
 
+def _get_lexical():
+    global _lexical
+    if _lexical is None:
+        _lexical = load_lexical_index()
+    return _lexical
+
+def _get_query_embeddings():
+    global _query_embeddings
+    if _query_embeddings is None:
+        _query_embeddings = QueryEmbeddingCache(
+            get_embeddings().embed_query,
+            settings.embedding_model,
+            settings.query_embedding_cache_size,
+            settings.query_embedding_warm_path,
+        )
+        atexit.register(_query_embeddings.save)
+    return _query_embeddings
+
+def embed_query(text: str) -> list:
+    """Query vector from the embedding model, served from the query embedding cache."""
+    return _get_query_embeddings().embed(text)
+
 @tool
+@metrics.timed("tool.search_faq")
 def search_faq(query: str) -> str:
     """Search FAQ for policy, process, how-to, troubleshooting questions.
     
     Args:
         query: Natural language question
     """
-    results = _get_store().similarity_search(query, k=3)
+    results = _retrieve_faq(query, settings.faq_retrieval)
     if not results:
         return "No relevant FAQ found."
-    return "\n---\n".join([d.page_content for d in results])
+    return "\n---\n".join(results)
+
+def _retrieve_faq(query: str, mode: str, k: int = 3) -> list:
+    """Top-k FAQ texts by vector search, or BM25 + vector fused with RRF.
+
+    In hybrid mode a confident lexical match is returned without embedding the query.
+    """
+    if mode == "hybrid":
+        lexical = _get_lexical()
+        with metrics.span("faq.bm25"):
+            hits = lexical.search(query, settings.faq_candidates)
+        if lexical.confident(query, hits, settings.faq_lexical_margin):
+            metrics.incr("faq.lexical_fast_path")
+            return [lexical.texts[i] for i, _ in hits[:k]]
+    
+    with metrics.span("faq.embed"):
+        vector = _get_query_embeddings().embed(query)
+    candidates = settings.faq_candidates if mode == "hybrid" else k
+    with metrics.span("faq.faiss"):
+        dense = [d.page_content for d in _get_store().similarity_search_by_vector(vector, k=candidates)]
+    if mode != "hybrid":
+        return dense
+    metrics.incr("faq.hybrid")
+    sparse = [lexical.texts[i] for i, _ in hits]
+    return reciprocal_rank_fusion([dense, sparse], settings.faq_rrf_k)[:k]
+
+def _count_rest(cur, counted: int) -> int:
+    """counted plus the rows left on cur, stopping once past query_count_limit."""
+    limit = settings.query_count_limit
+    while counted <= limit:
+        chunk = len(cur.fetchmany(min(1000, limit + 1 - counted)))
+        if not chunk:
+            break
+        counted += chunk
+    return counted
+
+def _run_sqlite(conn, sql: str, preview: int):
+    """Fetch preview rows under the query guard, then count the rest on the same cursor."""
+    with metrics.span("sqlite.query"), guarded(conn, sql, settings):
+        cur = conn.cursor()
+        try:
+            cur.execute(sql)
+            cols = [d[0] for d in cur.description]
+            rows = cur.fetchmany(preview + 1)
+            total = _count_rest(cur, len(rows)) if len(rows) > preview else len(rows)
+        finally:
+            cur.close()
+    return cols, rows, total
+
+def _run_columnar(conn, version, sql: str):
+    """Answer sql from the columnar engine, or None to fall back to SQLite."""
+    from src.columnar import get_engine
+    try:
+        with metrics.span("columnar.query"):
+            answer = get_engine(conn, version).execute(sql)
+    except Exception:
+        answer = None
+    metrics.incr("columnar.hit" if answer else "columnar.fallback")
+    if answer is None:
+        return None
+    cols, rows = answer
+    return cols, rows[:settings.query_preview_rows + 1], len(rows)
+
+def _format_rows(cols: list, rows: list, total: int) -> str:
+    """Render a preview table within the output byte budget."""
+    budget = settings.query_max_output_bytes
+    lines = [" | ".join(cols)]
+    used = len(lines[0].encode())
+    for row in rows:
+        line = " | ".join(str(v) for v in row)
+        used += len(line.encode()) + 1
+        if used > budget:
+            lines.append(f"... (output truncated at {budget} bytes)")
+            break
+        lines.append(line)
+    
+    result = "\n".join(lines) + "\n"
+    if total > len(rows):
+        capped = "+" if total > settings.query_count_limit else ""
+        result += f"... ({min(total, settings.query_count_limit)}{capped} total rows)"
+    return result
 
 @tool  
+@metrics.timed("tool.query_customers")
 def query_customers(sql: str) -> str:
     """Execute SQL on customers table for statistics, pricing, counts.
     
@@ -40,49 +161,64 @@ def query_customers(sql: str) -> str:
         return "Only SELECT queries allowed."
     
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(sql)
-        rows = cur.fetchall()
-        cols = [d[0] for d in cur.description]
-        conn.close()
-        
-        if not rows:
-            return "No results."
+        with get_db_pool().connection() as conn:
+            version = get_data_version(conn)
+            key = (version, normalize_sql(sql)) if version else None
+            cached = _query_cache.get(key) if key else None
+            if cached is not None:
+                return cached
+            
+            start = time.perf_counter()
+            preview = settings.query_preview_rows
+            answer = _run_columnar(conn, version, sql) if settings.query_engine == "columnar" else None
+            cols, rows, total = answer or _run_sqlite(conn, sql, preview)
         
-        result = " | ".join(cols) + "\n"
-        for row in rows[:15]:
-            result += " | ".join(str(v) for v in row) + "\n"
-        if len(rows) > 15:
-            result += f"... ({len(rows)} total rows)"
+        result = _format_rows(cols, rows[:preview], total) if rows else "No results."
+        if key:
+            _query_cache.put(key, result, time.perf_counter() - start)
         return result
+    except QueryTooExpensive as e:
+        return e.to_result()
     except Exception as e:
         return f"SQL Error: {e}"
 
+def _format_stats(snap: dict) -> str:
+    charges = snap["monthly_charges"]
+    churn_by_contract = {
+        contract: f"{by_churn.get('Yes', 0)}/{sum(by_churn.values())} churned"
+        for contract, by_churn in snap["churn_by_contract"].items()
+    }
+    return "\n".join([
+        f"Total: {snap['total']} customers",
+        f"Monthly charges: avg ${charges['avg']}, range ${charges['min']}-${charges['max']}",
+        f"Contracts: {snap['contracts']}",
+        f"Internet: {snap['internet']}",
+        f"Churn: {snap['churn']}",
+        f"Churn by contract: {churn_by_contract}",
+        f"Avg monthly charges by internet: {snap['avg_charges_by_internet']}",
+    ])
+
 @tool
+@metrics.timed("tool.get_stats")
 def get_stats() -> str:
     """Get customer base overview statistics."""
-    conn = get_db_connection()
-    cur = conn.cursor()
+    global _stats_text
+    with get_db_pool().connection() as conn:
+        loaded = load_stats_snapshot(conn)
+        if loaded is None:
+            return _format_stats(compute_stats_snapshot(conn))
     
-    stats = []
-    cur.execute("SELECT COUNT(*) FROM customers")
-    stats.append(f"Total: {cur.fetchone()[0]} customers")
-    
-    cur.execute("SELECT ROUND(AVG(monthly_charges),2), MIN(monthly_charges), MAX(monthly_charges) FROM customers")
-    r = cur.fetchone()
-    stats.append(f"Monthly charges: avg ${r[0]}, range ${r[1]}-${r[2]}")
-    
-    cur.execute("SELECT contract, COUNT(*) FROM customers GROUP BY contract")
-    stats.append(f"Contracts: {dict(cur.fetchall())}")
-    
-    cur.execute("SELECT internet_service, COUNT(*) FROM customers GROUP BY internet_service")
-    stats.append(f"Internet: {dict(cur.fetchall())}")
-    
-    cur.execute("SELECT churn, COUNT(*) FROM customers GROUP BY churn")
-    stats.append(f"Churn: {dict(cur.fetchall())}")
-    
-    conn.close()
-    return "\n".join(stats)
+    version, snap = loaded
+    if _stats_text[0] != version:
+        _stats_text = (version, _format_stats(snap))
+    return _stats_text[1]
+
+def _with_executor(sync_tool):
+    """Give a tool an async implementation that runs it on the tool executor."""
+    func = sync_tool.func
+    async def coroutine(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    sync_tool.coroutine = coroutine
+    return sync_tool
 
-TOOLS = [search_faq, query_customers, get_stats]
+TOOLS = [_with_executor(t) for t in (search_faq, query_customers, get_stats)]
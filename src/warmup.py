@@ -0,0 +1,81 @@
+"""Background warmup so the first request does not pay for model, index and page loads."""
+import asyncio
+import logging
+import threading
+import time
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+_timings = {}
+
+def ensure_artifacts():
+    """Build the DB and FAQ index if the image was built without `main.py build`."""
+    from src.data_loader import DB_PATH, INDEX_PATH, build_vector_store, init_sqlite_db
+    if not DB_PATH.exists():
+        logger.warning("telecom.db missing; building it at startup")
+        init_sqlite_db()
+    if not INDEX_PATH.exists():
+        logger.warning("FAISS index missing; building it at startup")
+        build_vector_store()
+
+def warm_db():
+    """Read the customers table and each of its indexes once so their pages are cached."""
+    from src.data_loader import get_db_pool
+    with get_db_pool().connection() as conn:
+        conn.execute("SELECT COUNT(total_charges) FROM customers NOT INDEXED").fetchone()
+        indexes = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'customers' AND sql IS NOT NULL"
+        ).fetchall()
+        for (name,) in indexes:
+            conn.execute(f"SELECT COUNT(*) FROM customers INDEXED BY {name}").fetchone()
+
+def warm_search():
+    """Load the FAISS and BM25 indexes and run the embedding model once."""
+    from src import tools
+    tools._get_store()
+    tools._get_lexical()
+    tools.embed_query("warmup")
+
+STAGES = (("artifacts", ensure_artifacts), ("db", warm_db), ("search", warm_search))
+
+def run(stages: tuple = STAGES) -> dict:
+    """Run stages in order, timing each; a failing stage is logged and left to lazy loading."""
+    for name, stage in stages:
+        start = time.perf_counter()
+        try:
+            stage()
+        except Exception:
+            logger.exception("Warmup stage %s failed", name)
+        _timings[name] = time.perf_counter() - start
+        metrics.observe(f"warmup.{name}_seconds", _timings[name])
+    return dict(_timings)
+
+def start(extra: tuple = ()) -> threading.Thread:
+    """Run warmup in a daemon thread; is_ready() turns true when it finishes."""
+    def target():
+        try:
+            run((*STAGES, *extra))
+        finally:
+            _ready.set()
+            logger.info("Warmup finished: %s; memory %s", {k: round(v, 3) for k, v in _timings.items()},
+                        {k: round(v, 1) for k, v in metrics.process_memory().items()})
+    thread = threading.Thread(target=target, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+def wait(timeout: float = None) -> bool:
+    return _ready.wait(timeout)
+
+async def wait_ready():
+    """Hold a request until warmup finishes instead of racing it to load the same state."""
+    if not _ready.is_set():
+        await asyncio.get_running_loop().run_in_executor(None, _ready.wait)
+
+def timings() -> dict:
+    return dict(_timings)
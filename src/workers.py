@@ -0,0 +1,58 @@
+"""Pre-fork server: load read-only state once, then fork workers sharing it."""
+import importlib
+import logging
+import os
+import signal
+import socket
+
+logger = logging.getLogger(__name__)
+
+def preload():
+    """Load the embedding model in the parent so forked workers share its weights copy-on-write.
+
+    Only weights are loaded here: running the model would start its thread
+    pools, which do not survive fork. The FAISS index needs no preloading; it
+    is memory-mapped, so workers already share it through the page cache.
+    """
+    from src.data_loader import get_embeddings
+    try:
+        get_embeddings()
+    except Exception:
+        logger.exception("Embedding model preload failed; workers will load their own copy")
+
+def _serve_worker(app_module: str, sock: socket.socket):
+    import uvicorn
+    app = importlib.import_module(app_module).app
+    uvicorn.Server(uvicorn.Config(app, log_level="info")).run(sockets=[sock])
+
+def serve(app_module: str, workers: int, host: str = "0.0.0.0", port: int = 8080):
+    """Serve app_module's ``app`` from `workers` forked processes on one listening socket."""
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    preload()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_worker(app_module, sock)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    logger.info("Serving %s on %s:%d with %d workers: %s", app_module, host, port, workers, children)
+
+    def forward(signum, _frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for pid in children:
+        os.waitpid(pid, 0)